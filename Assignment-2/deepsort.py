@@ -53,8 +53,18 @@ def deep_sorted(x: any) -> str:
         return repr(x)
 
 
+def handle_query(query: str) -> str:
+    """
+    Evaluate one line of input and deep-sort it, as the script does when it is run.
+
+    Examples:
+        >>> handle_query("{'b': [2, 1], 'a': 0}")
+        '{"a": 0, "b": [1, 2]}'
+    """
+    return deep_sorted(eval(query))
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(verbose=True)
-    x = eval(input())
-    print(deep_sorted(x))
+    print(handle_query(input()))
@@ -0,0 +1,145 @@
+"""
+@Author:  Tom Shabalin
+@ID:      321243339
+@Mail:    tomshabalin95@gmail.com
+@Date:    10/05/2024
+@Description: Exact branch-and-bound vertex cover engine for mincover, without an ILP solver
+"""
+
+import sys
+import timeit
+from kernel import adjacency, greedy_cover, kernelize
+from components import connected_components
+
+
+class _OutOfTime(Exception):
+    """Raised inside the search when the time limit is over."""
+
+
+def _without(adj: dict, removed: set) -> dict:
+    """A copy of adj without the removed nodes."""
+    return {node: neighbours - removed for node, neighbours in adj.items() if node not in removed}
+
+
+def branch_and_bound_cover(graph, k: int = None) -> set:
+    """
+    Find a minimum vertex cover with branch_and_bound_search, without a time limit.
+
+    Examples:
+    >>> cycle = {i: [(i - 1) % 5, (i + 1) % 5] for i in range(5)}
+    >>> len(branch_and_bound_cover(cycle))
+    3
+    """
+    cover, optimal = branch_and_bound_search(graph, k)
+    return cover
+
+
+def branch_and_bound_search(graph, k: int = None, time_limit: float = None) -> tuple:
+    """
+    Find a minimum vertex cover by branch and reduce. Every search node kernelizes its graph again
+    (see kernel.py: degree-0/1, degree-2 folding, Buss and the crown/LP reduction), prunes with the
+    LP lower bound of the kernel, solves its connected components one by one, and otherwise branches
+    on a vertex of maximum degree: either the vertex is in the cover, or all of its neighbours are.
+    The greedy cover is the first upper bound.
+
+    Input:
+    - graph: An undirected graph (networkx Graph or adjacency mapping).
+    - k: If given, only look for covers of size at most k (the FPT decision version).
+    - time_limit: If given, stop after this many seconds and return the best cover found so far.
+
+    Output:
+    - A tuple (cover, optimal). cover is the best vertex cover found, or None if k is given and no cover of size
+      at most k was found. optimal tells whether the search finished, so that cover is a minimum cover
+      (or there is no cover of size at most k).
+
+    Examples:
+    >>> petersen = {0: [1, 4, 5], 1: [0, 2, 6], 2: [1, 3, 7], 3: [2, 4, 8], 4: [3, 0, 9],
+    ...             5: [0, 7, 8], 6: [1, 8, 9], 7: [2, 9, 5], 8: [3, 5, 6], 9: [4, 6, 7]}
+    >>> cover, optimal = branch_and_bound_search(petersen)
+    >>> len(cover), optimal
+    (6, True)
+    >>> branch_and_bound_search(petersen, k=5)
+    (None, True)
+    >>> branch_and_bound_search({'a': ['b', 'c'], 'b': ['a'], 'c': ['a']})
+    ({'a'}, True)
+    >>> cover, optimal = branch_and_bound_search(petersen, time_limit=0)
+    >>> len(cover) >= 6, optimal
+    (True, False)
+    """
+    adj = adjacency(graph)
+    incumbent = greedy_cover(adj)
+    best = {"cover": incumbent, "size": len(incumbent)}
+    upper = len(incumbent) + 1 if k is None else min(len(incumbent), k) + 1
+    deadline = None if time_limit is None else timeit.default_timer() + time_limit
+
+    def record(cover: set) -> None:
+        # A complete cover of the whole graph, found somewhere down the search
+        if len(cover) < best["size"]:
+            best["cover"], best["size"] = cover, len(cover)
+
+    def search(adj: dict, upper: int, extend) -> set:
+        """
+        A minimum cover of adj if it has fewer than upper nodes, otherwise None.
+        extend turns a cover of adj into a cover of the whole graph, for the incumbent.
+        """
+        if deadline is not None and timeit.default_timer() > deadline:
+            raise _OutOfTime()
+        kernel = kernelize(adj)
+        reduced, offset = kernel.graph, kernel.offset
+        # No rule applies to the kernel any more, so its LP optimum is all-half (see kernel._crown_rule)
+        if offset + (len(reduced) + 1) // 2 >= upper:
+            return None
+        if not reduced:
+            cover = kernel.lift(set())
+            record(extend(cover))
+            return cover
+        lift = lambda cover: extend(kernel.lift(cover))
+        limit = upper - offset
+
+        components = connected_components(reduced)
+        if len(components) > 1:
+            # Smallest first; each component gets the budget left after the lower bounds of the others
+            components.sort(key=len)
+            bounds = [(len(component) + 1) // 2 for component in components]
+            fallback = [greedy_cover(component) for component in components]
+            found = set()
+            for i, component in enumerate(components):
+                rest = set().union(*fallback[i + 1:])
+                cover = search(component, limit - len(found) - sum(bounds[i + 1:]),
+                               lambda cover, found=found, rest=rest: lift(found | cover | rest))
+                if cover is None:
+                    return None
+                found |= cover
+            cover = kernel.lift(found)
+            record(extend(cover))
+            return cover
+
+        v = max(reduced, key=lambda node: len(reduced[node]))
+        neighbours = reduced[v]
+        found = search(_without(reduced, {v}), limit - 1, lambda cover: lift(cover | {v}))
+        if found is not None:
+            found |= {v}
+            limit = len(found)
+        if len(neighbours) < limit:
+            cover = search(_without(reduced, neighbours | {v}), limit - len(neighbours),
+                           lambda cover: lift(cover | neighbours))
+            if cover is not None:
+                found = cover | neighbours
+        return None if found is None else kernel.lift(found)
+
+    # Every level of the search removes at least one node
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * len(adj) + 100))
+    try:
+        cover = search(adj, upper, lambda cover: cover)
+        optimal = True
+    except _OutOfTime:
+        cover, optimal = None, False
+    if cover is None:
+        # Not finished, or nothing smaller than the greedy cover (or of size at most k)
+        cover = best["cover"] if k is None or best["size"] <= k else None
+    return cover, optimal
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
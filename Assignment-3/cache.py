@@ -0,0 +1,80 @@
+"""
+@Author:  Tom Shabalin
+@ID:      321243339
+@Mail:    tomshabalin95@gmail.com
+@Date:    10/05/2024
+@Description: On-disk cache of mincover results, keyed by a canonical hash of the graph
+"""
+
+import hashlib
+import json
+import os
+
+DEFAULT_CACHE_DIR = os.environ.get("MINCOVER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "mincover"))
+
+
+def graph_hash(adj: dict) -> str:
+    """
+    A hash of the edge set of a graph that does not depend on the order of the nodes, of the edges,
+    or of the two ends of an edge. Isolated nodes are ignored, since they never change the cover.
+    Graphs that are only isomorphic (same shape, other labels) get different hashes.
+
+    Input:
+    - adj: Adjacency dictionary {node: set of neighbours}.
+
+    Output:
+    - A hex string.
+
+    >>> graph_hash({0: {1}, 1: {0, 2}, 2: {1}}) == graph_hash({2: [1], 1: [2, 0], 0: [1], 5: []})
+    True
+    >>> graph_hash({0: {1}, 1: {0}}) == graph_hash({0: {2}, 2: {0}})
+    False
+    """
+    edges = sorted({tuple(sorted((repr(u), repr(v)))) for u in adj for v in adj[u]})
+    return hashlib.sha256(json.dumps(edges).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    A directory with one small JSON file per solved graph. The entries of every version live in their
+    own subdirectory, so that a new solver or entry format never reads the results of an older one.
+
+    >>> import tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> cache = ResultCache(directory, version="2")
+    >>> cache.get("abc") is None
+    True
+    >>> cache.put("abc", {"size": 3})
+    >>> cache.get("abc")
+    {'size': 3}
+    >>> ResultCache(directory, version="3").get("abc") is None
+    True
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, version: str = "1"):
+        self.directory = os.path.join(directory, f"v{version}")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> dict:
+        """The cached entry for key, or None (also if the file is not a JSON object)."""
+        try:
+            with open(self._path(key), encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def put(self, key: str, entry: dict) -> None:
+        """Store entry under key (atomically, so that parallel runs never see half a file)."""
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(temporary, self._path(key))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,179 @@
+"""
+@Author:  Tom Shabalin
+@ID:      321243339
+@Mail:    tomshabalin95@gmail.com
+@Date:    10/05/2024
+@Description: Connected-component decomposition of vertex cover, with closed forms for the easy components
+"""
+
+from collections import deque
+from kernel import max_bipartite_matching, alternating_reach, count_edges
+
+
+def connected_components(adj: dict) -> list:
+    """
+    Split an adjacency dictionary into the adjacency dictionaries of its connected components.
+
+    >>> connected_components({0: {1}, 1: {0}, 2: {3}, 3: {2}, 4: set()})
+    [{0: {1}, 1: {0}}, {2: {3}, 3: {2}}, {4: set()}]
+    """
+    seen, components = set(), []
+    for start in adj:
+        if start in seen:
+            continue
+        seen.add(start)
+        order, queue = [start], deque([start])
+        while queue:
+            for neighbour in adj[queue.popleft()]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    order.append(neighbour)
+                    queue.append(neighbour)
+        components.append({node: adj[node] for node in order})
+    return components
+
+
+def two_coloring(adj: dict) -> dict:
+    """
+    Colour a connected graph with colours 0 and 1 so that every edge has both colours.
+
+    Output:
+    - A dictionary {node: colour}, or None if the graph is not bipartite.
+
+    >>> two_coloring({0: {1}, 1: {0, 2}, 2: {1}})
+    {0: 0, 1: 1, 2: 0}
+    >>> two_coloring({0: {1, 2}, 1: {0, 2}, 2: {0, 1}}) is None
+    True
+    """
+    if not adj:
+        return {}
+    start = next(iter(adj))
+    colour, queue = {start: 0}, deque([start])
+    while queue:
+        node = queue.popleft()
+        for neighbour in adj[node]:
+            if neighbour not in colour:
+                colour[neighbour] = 1 - colour[node]
+                queue.append(neighbour)
+            elif colour[neighbour] == colour[node]:
+                return None
+    return colour
+
+
+def tree_cover(adj: dict) -> set:
+    """
+    Minimum vertex cover of a tree: going from the leaves up, take the parent of every uncovered edge.
+
+    >>> sorted(tree_cover({0: {1}, 1: {0, 2, 3}, 2: {1}, 3: {1, 4}, 4: {3}}))
+    [1, 3]
+    """
+    if not adj:
+        return set()
+    root = next(iter(adj))
+    parent, order, queue = {root: None}, [root], deque([root])
+    while queue:
+        node = queue.popleft()
+        for neighbour in adj[node]:
+            if neighbour not in parent:
+                parent[neighbour] = node
+                order.append(neighbour)
+                queue.append(neighbour)
+    cover = set()
+    for node in reversed(order):
+        if node not in cover and parent[node] is not None:
+            cover.add(parent[node])
+    return cover
+
+
+def bipartite_cover(adj: dict, colour: dict) -> set:
+    """
+    Minimum vertex cover of a bipartite graph from a maximum matching (Konig's theorem).
+
+    >>> sorted(bipartite_cover({0: {2, 3}, 1: {2}, 2: {0, 1}, 3: {0}}, {0: 0, 1: 0, 2: 1, 3: 1}))
+    [0, 1]
+    """
+    left = {node: adj[node] for node in adj if colour[node] == 0}
+    reached_left, reached_right = alternating_reach(left, max_bipartite_matching(left))
+    return (set(left) - reached_left) | reached_right
+
+
+def polynomial_cover(adj: dict) -> set:
+    """
+    Minimum vertex cover of a connected component, when it has a closed form or a polynomial algorithm:
+    no edges, cliques (all nodes but one), cycles (every other node), trees and bipartite graphs.
+
+    Output:
+    - A minimum vertex cover, or None if the component is none of the above.
+
+    >>> len(polynomial_cover({i: {j for j in range(5) if j != i} for i in range(5)}))
+    4
+    >>> len(polynomial_cover({i: {(i - 1) % 7, (i + 1) % 7} for i in range(7)}))
+    4
+    >>> polynomial_cover({0: {1, 2, 3}, 1: {0, 2}, 2: {0, 1, 3}, 3: {0, 2, 4}, 4: {3, 5, 6}, 5: {4, 6}, 6: {4, 5}}) is None
+    True
+    """
+    nodes, edges = len(adj), count_edges(adj)
+    if any(node in adj[node] for node in adj):
+        return None
+    if edges == 0:
+        return set()
+    if edges == nodes * (nodes - 1) // 2:
+        return set(list(adj)[1:])
+    if edges == nodes - 1:
+        return tree_cover(adj)
+    if all(len(neighbours) == 2 for neighbours in adj.values()):
+        # A connected 2-regular graph is a cycle; walk around it taking every other node
+        start = next(iter(adj))
+        cover, previous, node = set(), None, start
+        for position in range(nodes):
+            if position % 2 == 0:
+                cover.add(node)
+            previous, node = node, next(n for n in adj[node] if n != previous)
+        return cover
+    colour = two_coloring(adj)
+    if colour is not None:
+        return bipartite_cover(adj, colour)
+    return None
+
+
+def solve_by_components(adj: dict, solve, workers: int = None) -> int:
+    """
+    Minimum vertex cover size as the sum over connected components. Easy components are solved
+    by polynomial_cover, and the others by solve, in parallel in a process pool.
+
+    Input:
+    - adj: Adjacency dictionary of the graph.
+    - solve: A picklable function from the adjacency of a component to the size of its minimum cover (or -1).
+    - workers: Size of the process pool (None for one per CPU, 1 to solve in this process).
+
+    Output:
+    - The size of the minimum vertex cover, or -1 if solve failed on any component.
+
+    >>> solve_by_components({0: {1}, 1: {0}, 2: {3, 4}, 3: {2, 4}, 4: {2, 3}}, solve=None)
+    3
+    """
+    total, hard = 0, []
+    for component in connected_components(adj):
+        cover = polynomial_cover(component)
+        if cover is not None:
+            total += len(cover)
+        else:
+            hard.append(component)
+
+    if workers == 1 or len(hard) <= 1:
+        sizes = [solve(component) for component in hard]
+    else:
+        # Largest components first, so that the pool is not left waiting on one big job at the end
+        hard.sort(key=len, reverse=True)
+        from concurrent.futures import ProcessPoolExecutor  # here, since it is slow to import and rarely needed
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            sizes = list(pool.map(solve, hard))
+
+    if any(size < 0 for size in sizes):
+        return -1
+    return total + sum(sizes)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,407 @@
+"""
+@Author:  Tom Shabalin
+@ID:      321243339
+@Mail:    tomshabalin95@gmail.com
+@Date:    10/05/2024
+@Description: Vertex cover kernelization used by mincover before the exact solve
+"""
+
+from collections import deque
+import heapq
+
+
+def adjacency(graph) -> dict:
+    """
+    Copy a graph into a plain adjacency dictionary {node: set of neighbours}.
+
+    Input:
+    - graph: A networkx Graph, or any mapping from a node to an iterable of its neighbours.
+
+    Output:
+    - A new dictionary that can be modified without touching the input graph.
+      Edges listed in one direction only are added in the other direction too.
+
+    >>> adjacency({0: [1, 2], 1: [0], 2: [0]}) == {0: {1, 2}, 1: {0}, 2: {0}}
+    True
+    >>> adjacency({0: [1]}) == {0: {1}, 1: {0}}
+    True
+    """
+    adj = {node: set(graph[node]) for node in graph}
+    for node, neighbours in list(adj.items()):
+        for neighbour in neighbours:
+            adj.setdefault(neighbour, set()).add(node)
+    return adj
+
+
+def from_edges(edges) -> dict:
+    """
+    Build an adjacency dictionary from a list of edges.
+
+    >>> from_edges([(0, 1), (1, 2)]) == {0: {1}, 1: {0, 2}, 2: {1}}
+    True
+    """
+    adj = {}
+    for u, v in edges:
+        adj.setdefault(u, set()).add(v)
+        adj.setdefault(v, set()).add(u)
+    return adj
+
+
+def count_edges(adj: dict) -> int:
+    """
+    Count the edges of an adjacency dictionary (a self-loop counts once).
+
+    >>> count_edges({0: {1, 2}, 1: {0}, 2: {0, 2}})
+    3
+    """
+    loops = sum(1 for node in adj if node in adj[node])
+    return (sum(len(neighbours) for neighbours in adj.values()) + loops) // 2
+
+
+def greedy_cover(adj: dict) -> set:
+    """
+    Find a (not necessarily minimum) vertex cover by repeatedly taking a vertex of maximum degree.
+
+    >>> sorted(greedy_cover({0: {1, 2, 3}, 1: {0}, 2: {0}, 3: {0}}))
+    [0]
+    """
+    adj = adjacency(adj)
+    cover = set()
+    order = {node: i for i, node in enumerate(adj)}
+    heap = [(-len(adj[node]), order[node], node) for node in adj]
+    heapq.heapify(heap)
+    while heap:
+        degree, i, node = heapq.heappop(heap)
+        if node not in adj:
+            continue
+        if -degree != len(adj[node]):
+            # Degrees only go down, so a stale entry is pushed back with its current degree
+            heapq.heappush(heap, (-len(adj[node]), i, node))
+            continue
+        if degree == 0:
+            break
+        cover.add(node)
+        for neighbour in adj.pop(node):
+            if neighbour != node:
+                adj[neighbour].discard(node)
+    return cover
+
+
+def max_bipartite_matching(adj: dict) -> dict:
+    """
+    Hopcroft-Karp maximum matching on the bipartite double cover of a graph:
+    every node appears once on the left and once on the right, and every edge u-v
+    becomes the two edges u(left)-v(right) and v(left)-u(right).
+    Given only the left side of a bipartite graph {left node: set of right nodes},
+    it is the maximum matching of that bipartite graph.
+
+    Output:
+    - A dictionary mapping each matched left node to its right partner.
+
+    >>> len(max_bipartite_matching({0: {1}, 1: {0, 2}, 2: {1}}))
+    2
+    """
+    match_left, match_right = {}, {}
+
+    def layers():
+        dist, queue, found = {}, deque(), False
+        for u in adj:
+            if u not in match_left:
+                dist[u] = 0
+                queue.append(u)
+        while queue:
+            u = queue.popleft()
+            for v in adj[u]:
+                w = match_right.get(v)
+                if w is None:
+                    found = True
+                elif w not in dist:
+                    dist[w] = dist[u] + 1
+                    queue.append(w)
+        return dist, found
+
+    def augment(root, dist) -> bool:
+        # Iterative DFS, so long alternating paths do not hit the recursion limit
+        stack = [[root, iter(adj[root]), None]]
+        while stack:
+            frame = stack[-1]
+            u, neighbours = frame[0], frame[1]
+            for v in neighbours:
+                w = match_right.get(v)
+                if w is None:
+                    frame[2] = v
+                    for left, _, right in stack:
+                        match_left[left] = right
+                        match_right[right] = left
+                    return True
+                if dist.get(w) == dist[u] + 1:
+                    frame[2] = v
+                    stack.append([w, iter(adj[w]), None])
+                    break
+            else:
+                dist[u] = None
+                stack.pop()
+        return False
+
+    while True:
+        dist, found = layers()
+        if not found:
+            break
+        for u in list(adj):
+            if u not in match_left:
+                augment(u, dist)
+    return match_left
+
+
+def alternating_reach(adj: dict, match_left: dict) -> tuple:
+    """
+    Find the left and right nodes reachable from the unmatched left nodes by alternating paths.
+    By Konig's theorem, (left - reached left) + (reached right) is a minimum vertex cover of the bipartite graph.
+
+    Input:
+    - adj: Adjacency of the left nodes {left node: set of right nodes}.
+    - match_left: A maximum matching {left node: right node}, as returned by max_bipartite_matching.
+
+    Output:
+    - A tuple (reached left nodes, reached right nodes).
+    """
+    match_right = {right: left for left, right in match_left.items()}
+    reached_left = {u for u in adj if u not in match_left}
+    reached_right = set()
+    queue = deque(reached_left)
+    while queue:
+        u = queue.popleft()
+        for v in adj[u]:
+            if v not in reached_right:
+                reached_right.add(v)
+                w = match_right.get(v)
+                if w is not None and w not in reached_left:
+                    reached_left.add(w)
+                    queue.append(w)
+    return reached_left, reached_right
+
+
+def half_integral_lp(adj: dict) -> dict:
+    """
+    Solve the LP relaxation of vertex cover. The optimum is half-integral and is read off
+    a minimum vertex cover of the bipartite double cover (Konig's theorem).
+
+    Output:
+    - A dictionary mapping each node to its LP value: 0, 0.5 or 1.
+
+    >>> half_integral_lp({0: {1, 2, 3}, 1: {0}, 2: {0}, 3: {0}}) == {0: 1, 1: 0, 2: 0, 3: 0}
+    True
+    >>> half_integral_lp({0: {1, 2}, 1: {0, 2}, 2: {0, 1}}) == {0: 0.5, 1: 0.5, 2: 0.5}
+    True
+    """
+    reached_left, reached_right = alternating_reach(adj, max_bipartite_matching(adj))
+
+    # The bipartite cover is (left - reached) + (right & reached)
+    return {node: ((node not in reached_left) + (node in reached_right)) / 2 for node in adj}
+
+
+def lp_lower_bound(adj: dict) -> int:
+    """
+    Lower bound on the size of a minimum vertex cover: the LP optimum (half the maximum
+    matching of the bipartite double cover), rounded up.
+
+    >>> lp_lower_bound({0: {1, 2}, 1: {0, 2}, 2: {0, 1}})
+    2
+    """
+    return (len(max_bipartite_matching(adj)) + 1) // 2
+
+
+class _FoldedVertex:
+    """A fresh node standing for a folded degree-2 vertex and its two neighbours."""
+
+    def __init__(self, index: int):
+        self.index = index
+
+    def __repr__(self):
+        return f"fold{self.index}"
+
+
+class Kernel:
+    """
+    The result of kernelize: the reduced graph plus everything needed to lift its cover back.
+
+    Attributes:
+    - graph: Adjacency dictionary of the kernel that is still left to solve.
+    - cover: Nodes that the reductions put in the cover.
+    - folds: Degree-2 folds (v, u, w, z) in the order they were applied.
+    - stats: For every rule, how many nodes and edges it removed.
+    """
+
+    RULES = ("degree-0/1", "degree-2", "high-degree", "crown")
+
+    def __init__(self, graph: dict):
+        self.graph = graph
+        self.cover = set()
+        self.folds = []
+        self.stats = {rule: [0, 0] for rule in self.RULES}
+        self.original_size = (len(graph), count_edges(graph))
+
+    @property
+    def offset(self) -> int:
+        """How much the reductions already added to the size of the minimum cover."""
+        return len(self.cover) + len(self.folds)
+
+    def lift(self, kernel_cover) -> set:
+        """
+        Turn a minimum cover of the kernel into a minimum cover of the original graph.
+        """
+        cover = set(kernel_cover) | self.cover
+        for v, u, w, z in reversed(self.folds):
+            if z in cover:
+                cover.discard(z)
+                cover.update((u, w))
+            else:
+                cover.add(v)
+        return cover
+
+    def report(self) -> str:
+        """
+        A readable summary of how much each rule shrank the instance.
+        """
+        nodes, edges = self.original_size
+        lines = [f"original: {nodes} nodes, {edges} edges"]
+        for rule in self.RULES:
+            removed_nodes, removed_edges = self.stats[rule]
+            lines.append(f"{rule}: -{removed_nodes} nodes, -{removed_edges} edges")
+        lines.append(f"kernel: {len(self.graph)} nodes, {count_edges(self.graph)} edges, {self.offset} already in the cover")
+        return "\n".join(lines)
+
+
+def _take(adj: dict, node) -> set:
+    """Remove a node from the graph and return its former neighbours."""
+    neighbours = adj.pop(node)
+    for neighbour in neighbours:
+        if neighbour != node:
+            adj[neighbour].discard(node)
+    neighbours.discard(node)
+    return neighbours
+
+
+def _low_degree_rule(adj: dict, kernel: Kernel) -> None:
+    # Self-loop: the node must be in the cover. Degree 0: drop it. Degree 1: take its neighbour.
+    queue = [node for node in adj if len(adj[node]) <= 1 or node in adj[node]]
+    while queue:
+        node = queue.pop()
+        if node not in adj:
+            continue
+        if node in adj[node]:
+            kernel.cover.add(node)
+            queue.extend(_take(adj, node))
+        elif not adj[node]:
+            del adj[node]
+        elif len(adj[node]) == 1:
+            (neighbour,) = adj[node]
+            kernel.cover.add(neighbour)
+            queue.extend(_take(adj, neighbour))
+
+
+def _degree_two_rule(adj: dict, kernel: Kernel) -> None:
+    for v in list(adj):
+        if v not in adj or len(adj[v]) != 2:
+            continue
+        u, w = adj[v]
+        if w in adj[u]:
+            # v, u, w is a triangle and v sees nothing else: u and w are enough
+            kernel.cover.update((u, w))
+            _take(adj, u)
+            _take(adj, w)
+            del adj[v]
+            continue
+        # Fold v, u, w into one new node z: z in the cover means u and w, otherwise v
+        z = _FoldedVertex(len(kernel.folds))
+        neighbours = (adj[u] | adj[w]) - {v, u, w}
+        for node in (v, u, w):
+            _take(adj, node)
+        adj[z] = neighbours
+        for neighbour in neighbours:
+            adj[neighbour].add(z)
+        kernel.folds.append((v, u, w, z))
+
+
+def _high_degree_rule(adj: dict, kernel: Kernel) -> None:
+    # Buss: a node with more neighbours than an upper bound on the optimum is in every minimum cover
+    budget = len(greedy_cover(adj))
+    for node in sorted(adj, key=lambda node: len(adj[node]), reverse=True):
+        if len(adj[node]) <= budget:
+            break
+        kernel.cover.add(node)
+        _take(adj, node)
+        budget -= 1
+
+
+def _crown_rule(adj: dict, kernel: Kernel) -> None:
+    # Nemhauser-Trotter: some minimum cover contains every LP-1 node and no LP-0 node
+    for node, value in half_integral_lp(adj).items():
+        if value == 1:
+            kernel.cover.add(node)
+            _take(adj, node)
+    for node in [node for node in adj if not adj[node]]:
+        del adj[node]
+
+
+def kernelize(graph) -> Kernel:
+    """
+    Shrink a vertex cover instance with the standard reductions, applied until none of them changes the graph:
+    - degree-0/1: drop isolated nodes, take the neighbour of every leaf (and every node with a self-loop).
+    - degree-2: take both neighbours of a degree-2 node in a triangle, fold it otherwise.
+    - high-degree: Buss rule, using the greedy cover as the upper bound.
+    - crown: Nemhauser-Trotter reduction with the half-integral LP optimum.
+
+    The minimum cover of the graph is kernel.lift(minimum cover of kernel.graph).
+
+    Input:
+    - graph: An undirected graph (networkx Graph or adjacency mapping). It is not modified.
+
+    Output:
+    - A Kernel.
+
+    >>> path = {0: [1], 1: [0, 2], 2: [1, 3], 3: [2, 4], 4: [3]}
+    >>> k = kernelize(path)
+    >>> k.graph, len(k.lift(set()))
+    ({}, 2)
+    >>> star = {0: [1, 2, 3], 1: [0], 2: [0], 3: [0]}
+    >>> sorted(kernelize(star).lift(set()))
+    [0]
+    >>> k4 = {i: [j for j in range(4) if j != i] for i in range(4)}
+    >>> len(kernelize(k4).graph)
+    4
+    >>> print(kernelize(path).report())
+    original: 5 nodes, 4 edges
+    degree-0/1: -5 nodes, -4 edges
+    degree-2: -0 nodes, -0 edges
+    high-degree: -0 nodes, -0 edges
+    crown: -0 nodes, -0 edges
+    kernel: 0 nodes, 0 edges, 2 already in the cover
+    """
+    adj = adjacency(graph)
+    kernel = Kernel(adj)
+    rules = (
+        ("degree-0/1", _low_degree_rule),
+        ("degree-2", _degree_two_rule),
+        ("high-degree", _high_degree_rule),
+        ("crown", _crown_rule),
+    )
+    changed = True
+    while changed and adj:
+        changed = False
+        for name, rule in rules:
+            nodes, edges = len(adj), count_edges(adj)
+            rule(adj, kernel)
+            removed_nodes, removed_edges = nodes - len(adj), edges - count_edges(adj)
+            kernel.stats[name][0] += removed_nodes
+            kernel.stats[name][1] += removed_edges
+            if removed_nodes or removed_edges:
+                # Restart from the cheap rules whenever something changed
+                changed = True
+                break
+    return kernel
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
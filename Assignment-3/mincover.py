@@ -1,64 +1,303 @@
-import subprocess, sys
-subprocess.check_call([sys.executable, "-m", "pip", "install", "cvxpy"], stdout=subprocess.DEVNULL)
-subprocess.check_call([sys.executable, "-m", "pip", "install", "cvxopt"], stdout=subprocess.DEVNULL)
+# networkx and cvxpy are imported only by the functions that need them,
+# so that importing this module and solving a small graph stays fast.
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, NamedTuple
+import os, random, subprocess, sys
+import timeit
+from kernel import kernelize, adjacency, count_edges, from_edges, lp_lower_bound
+from branch_and_bound import branch_and_bound_cover, branch_and_bound_search
+from components import solve_by_components
+from functools import partial
 
-import networkx as nx, cvxpy, numpy as np, matplotlib.pyplot as plt
-from networkx.algorithms import approximation
-import random
+if TYPE_CHECKING:
+    import networkx as nx
 
-def mincover(graph: nx.Graph) -> int:
+# With backend="auto", kernels up to this many nodes go to the branch-and-bound engine.
+# In compare_backends(num_nodes=n, edges_per_node=3) and on random 3-regular graphs it was faster than the ILP
+# at every kernel size both finished (0.35s vs 36s at 170 nodes), and solved kernels of 206-260 nodes in 3-82s,
+# where the ILP took over 240s; from about 275 nodes neither finished in minutes.
+AUTO_BNB_MAX_NODES = 300
+
+def mincover(graph: "nx.Graph", preprocess: bool = True, backend: str = "auto", split: bool = False, workers: int = None) -> int:
     """
     The mincover function takes an undirected graph as input and finds the size of the smallest vertex cover, 
     which is the smallest subset of nodes such that every edge in the graph is adjacent to at least one node in the subset.
 
     Input:
-    - graph: An undirected graph represented as a networkx Graph object.
+    - graph: An undirected graph represented as a networkx Graph object (or an adjacency dictionary).
+    - preprocess: Shrink the graph with the vertex cover reductions of kernel.py first, and send only the kernel to the solver.
+    - backend: "ilp" solves with cvxpy and GLPK_MI, "bnb" with the branch-and-bound engine of branch_and_bound.py,
+      and "auto" picks "bnb" for kernels up to AUTO_BNB_MAX_NODES nodes (or when "ilp" is not installed) and "ilp" otherwise.
+    - split: Solve every connected component on its own (see components.py): trees, cycles, cliques and bipartite
+      components in polynomial time, and the rest in parallel in a process pool.
+    - workers: Size of that process pool (None for one worker per CPU, 1 to solve everything in this process).
 
     Output:
     - An integer representing the size of the smallest vertex cover. If a feasible cover is found, the function returns the size of the cover. 
     If no feasible cover exists, the function returns -1.
+
+    Examples:
+    >>> mincover({0: [1, 2], 1: [0, 2], 2: [0, 1]}, backend="bnb")
+    2
+    >>> mincover({0: [1, 2], 1: [0, 2], 2: [0, 1], 3: [4], 4: [3]}, split=True, workers=1)
+    3
+    >>> mincover({0: [1]}, backend="simplex")
+    Traceback (most recent call last):
+        ...
+    ValueError: Unknown backend 'simplex'. Please choose one of ['auto', 'bnb', 'ilp'].
     """
+    if backend != "auto" and backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}. Please choose one of {sorted([*BACKENDS, 'auto'])}.")
+    adj = adjacency(graph)
+
     # Check for special cases:
     # Case 1: 1 edge
-    if len(graph.edges()) == 1:
+    if count_edges(adj) == 1:
         return 1
     # Case 2: No edges
-    if len(graph.edges()) == 0:
+    if count_edges(adj) == 0:
         return 0
 
-    # Define variables
-    n = len(graph.nodes())
-    x = cvxpy.Variable(n, boolean = True)
+    if split:
+        return solve_by_components(adj, partial(mincover, preprocess=preprocess, backend=backend), workers)
+
+    if not preprocess:
+        cover = _backend(backend, len(adj))(adj)
+        return len(cover) if cover is not None else -1
+
+    kernel = kernelize(adj)
+    cover = _backend(backend, len(kernel.graph))(kernel.graph) if kernel.graph else set()
+    if cover is None:
+        return -1
+    return len(kernel.lift(cover))
+
+def _build_ilp(adj: dict):
+    """
+    Build the vertex cover integer program: minimize sum(x) subject to E @ x >= 1,
+    where E is the sparse edge-node incidence matrix.
+
+    Input:
+    - adj: Adjacency dictionary {node: set of neighbours}. Nodes may have any labels.
+
+    Output:
+    - The cvxpy problem, its variable x, and the list of nodes (x[i] belongs to nodes[i]).
+    """
+    cvxpy = _import_ilp()
+    import numpy as np
+    from scipy import sparse
+
+    # Define variables (one per node; labels are mapped to indices 0..n-1)
+    nodes = list(adj)
+    index = {node: i for i, node in enumerate(nodes)}
+    x = cvxpy.Variable(len(nodes), boolean = True)
 
-    # Define constraints
-    constraints = []
-    for u, v in graph.edges():
-        constraints.append(x[u] + x[v] >= 1) # At least one endpoint of each edge must be in the cover
+    # Define constraints: one row per edge, with a 1 in the columns of its two endpoints
+    edges = np.array([(index[u], index[v]) for u in adj for v in adj[u] if index[u] <= index[v]], dtype=np.int64).reshape(-1, 2)
+    rows = np.repeat(np.arange(len(edges)), 2)
+    incidence = sparse.csr_matrix((np.ones(2 * len(edges)), (rows, edges.ravel())), shape=(len(edges), len(nodes)))
+    constraints = [incidence @ x >= 1] # At least one endpoint of each edge must be in the cover
 
     # Define objective function
     objective = cvxpy.Minimize(cvxpy.sum(x))
 
     # Define problem
     problem = cvxpy.Problem(objective, constraints)
+    return problem, x, nodes
+
+def _solve_ilp(adj: dict) -> set:
+    """
+    Solve minimum vertex cover exactly as an integer program with GLPK_MI.
+
+    Input:
+    - adj: Adjacency dictionary {node: set of neighbours}.
+
+    Output:
+    - The set of nodes in a minimum cover, or None if the solver did not reach optimality.
+    """
+    cvxpy = _import_ilp()
+    problem, x, nodes = _build_ilp(adj)
 
     # Solve problem
     problem.solve(solver=cvxpy.GLPK_MI)
 
     # Check if solver status is optimal and solution exists
     if problem.status == 'optimal' and x.value is not None:
-        # Return the size of the smallest cover
-        return int(sum(x.value))
+        return {node for node, value in zip(nodes, x.value) if value > 0.5}
     else:
-        # Return -1 if no feasible cover exists
-        return -1
+        return None
+
+BACKENDS = {"ilp": _solve_ilp, "bnb": branch_and_bound_cover}
+
+def available_backends() -> list:
+    """
+    List the backends that can run here, without importing any of them.
+
+    >>> "bnb" in available_backends()
+    True
+    """
+    backends = ["bnb"]
+    # cvxpy gets GLPK_MI from cvxopt
+    if find_spec("cvxpy") is not None and find_spec("cvxopt") is not None:
+        backends.append("ilp")
+    return backends
+
+def _import_ilp():
+    """
+    Import cvxpy for the "ilp" backend, with a clear error if it or its GLPK_MI solver is missing.
+    """
+    try:
+        import cvxpy
+    except ImportError:
+        raise ImportError('The "ilp" backend needs cvxpy with the GLPK_MI solver: pip install cvxpy cvxopt. '
+                          'Use backend="bnb" to solve without it.') from None
+    if cvxpy.GLPK_MI not in cvxpy.installed_solvers():
+        raise ImportError('The "ilp" backend needs the GLPK_MI solver of cvxpy: pip install cvxopt. '
+                          'Use backend="bnb" to solve without it.')
+    return cvxpy
+
+def _backend(name: str, num_nodes: int):
+    """
+    Resolve a backend name (including "auto") for a graph with num_nodes nodes to its solve function.
+    """
+    if name == "auto":
+        name = "bnb" if num_nodes <= AUTO_BNB_MAX_NODES or "ilp" not in available_backends() else "ilp"
+    return BACKENDS[name]
+
+class BoundedCover(NamedTuple):
+    """
+    The result of a time-limited mincover: the size of the best cover found, a lower bound
+    on the size of the minimum cover, the gap between them (0 means the size is optimal),
+    and the cover itself.
+    """
+    size: int
+    lower_bound: int
+    gap: int
+    cover: set
+
+def mincover_bounded(graph: "nx.Graph", time_limit: float = None) -> BoundedCover:
+    """
+    Like mincover, but stop after about time_limit seconds and return the best cover found so far,
+    together with its LP lower bound. The graph is kernelized first (this part is not interrupted),
+    and the kernel is solved with the branch-and-bound engine.
+
+    Input:
+    - graph: An undirected graph represented as a networkx Graph object (or an adjacency dictionary).
+    - time_limit: Time budget in seconds, or None to run until the cover is proven optimal.
+
+    Output:
+    - A BoundedCover.
+
+    Examples:
+    >>> mincover_bounded({0: [1, 2], 1: [0, 2], 2: [0, 1]}).size
+    2
+    >>> mincover_bounded({0: [1, 2], 1: [0], 2: [0]})
+    BoundedCover(size=1, lower_bound=1, gap=0, cover={0})
+    >>> petersen = {0: [1, 4, 5], 1: [0, 2, 6], 2: [1, 3, 7], 3: [2, 4, 8], 4: [3, 0, 9],
+    ...             5: [0, 7, 8], 6: [1, 8, 9], 7: [2, 9, 5], 8: [3, 5, 6], 9: [4, 6, 7]}
+    >>> result = mincover_bounded(petersen, time_limit=0)
+    >>> result.lower_bound <= 6 <= result.size, result.gap == result.size - result.lower_bound, len(result.cover) == result.size
+    (True, True, True)
+    """
+    start_time = timeit.default_timer()
+    kernel = kernelize(adjacency(graph))
+    if time_limit is not None:
+        time_limit = max(0.0, time_limit - (timeit.default_timer() - start_time))
+    cover, optimal = branch_and_bound_search(kernel.graph, time_limit=time_limit)
+    cover = kernel.lift(cover)
+    size = len(cover)
+    lower_bound = size if optimal else kernel.offset + lp_lower_bound(kernel.graph)
+    return BoundedCover(size, lower_bound, size - lower_bound, cover)
 
-def generate_random_graph() -> nx.Graph:
+# The version of the results mincover_batch caches: bump it whenever mincover_bounded or the entry format changes
+CACHE_VERSION = "2"
+
+def _cached_result(entry: dict, adj: dict, time_limit: float) -> BoundedCover:
+    """
+    The BoundedCover of a cache entry for the graph adj, or None if the entry cannot be reused: it is
+    not optimal and got a smaller time budget, or it is malformed, or its cover does not cover adj.
+
+    >>> adj = {0: {1}, 1: {0}}
+    >>> _cached_result({"size": 1, "lower_bound": 1, "gap": 0, "cover": ["0"], "time_limit": None}, adj, 1.0)
+    BoundedCover(size=1, lower_bound=1, gap=0, cover={0})
+    >>> _cached_result({"size": 1, "lower_bound": 1}, adj, 1.0) is None
+    True
+    >>> _cached_result({"size": 1, "lower_bound": 1, "gap": 0, "cover": ["5"], "time_limit": None}, adj, 1.0) is None
+    True
+    """
+    try:
+        size, lower_bound, gap, labels, entry_limit = (entry[key] for key in ("size", "lower_bound", "gap", "cover", "time_limit"))
+        if gap != 0 and (time_limit is None or entry_limit is None or entry_limit < time_limit):
+            return None
+        # The cover is stored as the reprs of its nodes (the graph_hash labels), which map back to this graph's nodes
+        nodes = {repr(node): node for node in adj}
+        cover = {nodes[label] for label in labels}
+    except (KeyError, TypeError):
+        return None
+    if len(cover) != size or gap != size - lower_bound or any(u not in cover and v not in cover for u in adj for v in adj[u]):
+        return None
+    return BoundedCover(size, lower_bound, gap, cover)
+
+def mincover_batch(graphs: list, time_limit: float = None, workers: int = None, cache_dir: str = None, use_cache: bool = True) -> list:
+    """
+    Solve many graphs with mincover_bounded in a process pool. Results are cached on disk by graph_hash
+    (see cache.py), so a graph is never solved twice, in this batch or in a later run.
+    A cached result is reused if it is optimal, or if it got at least the same time budget,
+    and only if it is well-formed, is a cover of the graph, and comes from this CACHE_VERSION.
+
+    Input:
+    - graphs: A list of graphs (networkx Graph objects or adjacency dictionaries).
+    - time_limit: Time budget in seconds for every graph, or None.
+    - workers: Size of the process pool (None for one worker per CPU, 1 to solve in this process).
+    - cache_dir: Directory of the cache (None for MINCOVER_CACHE, or ~/.cache/mincover).
+    - use_cache: Whether to read and store results in the cache.
+
+    Output:
+    - A list with one BoundedCover per graph, in the same order.
+
+    Examples:
+    >>> triangle, edge = {0: [1, 2], 1: [0, 2], 2: [0, 1]}, {'a': ['b']}
+    >>> [(result.size, result.gap, len(result.cover)) for result in mincover_batch([triangle, edge, triangle], workers=1, use_cache=False)]
+    [(2, 0, 2), (1, 0, 1), (2, 0, 2)]
+    """
+    # Imported here, so that importing mincover (and every single mincover call) does not pay for them
+    from concurrent.futures import ProcessPoolExecutor
+    from cache import ResultCache, graph_hash, DEFAULT_CACHE_DIR
+
+    cache = ResultCache(cache_dir or DEFAULT_CACHE_DIR, CACHE_VERSION) if use_cache else None
+    adjs = [adjacency(graph) for graph in graphs]
+    keys = [graph_hash(adj) for adj in adjs]
+    results = [None] * len(adjs)
+    pending = {}  # key -> indices of the graphs with this key that still need a solve
+
+    for i, key in enumerate(keys):
+        entry = cache.get(key) if cache is not None else None
+        results[i] = _cached_result(entry, adjs[i], time_limit) if entry is not None else None
+        if results[i] is None:
+            pending.setdefault(key, []).append(i)
+
+    jobs = [adjs[indices[0]] for indices in pending.values()]
+    solve = partial(mincover_bounded, time_limit=time_limit)
+    if workers == 1 or len(jobs) <= 1:
+        solved = [solve(adj) for adj in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            solved = list(pool.map(solve, jobs))
+
+    for (key, indices), result in zip(pending.items(), solved):
+        for i in indices:
+            results[i] = result
+        if cache is not None:
+            cache.put(key, {**result._asdict(), "cover": sorted(map(repr, result.cover)), "time_limit": time_limit})
+    return results
+
+def generate_random_graph() -> "nx.Graph":
     """
     Generate a random undirected graph with a random number of nodes and edges.
 
     Output:
     - A random undirected graph represented as a networkx Graph object.
     """
+    import networkx as nx
     num_nodes = random.randint(2, 50)
     num_edges = random.randint(0, min(num_nodes * (num_nodes - 1) // 2, 1000))
     graph = nx.gnm_random_graph(num_nodes, num_edges)
@@ -67,23 +306,108 @@ def generate_random_graph() -> nx.Graph:
 def test_mincover():
     """
     Test the mincover function on 50 random graphs and record the number of nodes, edges, and the size of the minimum cover.
+    Every graph is solved both by mincover and by mincover_batch (without its disk cache), and the two sizes must agree.
 
     Output:
     - A list of tuples containing the number of nodes, edges, and the size of the minimum cover for each random graph.
     """
+    from networkx.algorithms import approximation
+    graphs = [generate_random_graph() for _ in range(50)]
     results = []
-    for _ in range(50):
-        graph = generate_random_graph()
+    for graph, found in zip(graphs, mincover_batch(graphs, use_cache=False)):
         min_cover_size_found = mincover(graph)
+        if min_cover_size_found != found.size:
+            raise AssertionError(f"mincover found {min_cover_size_found} but mincover_batch found {found.size}.")
         min_cover_size_approx = len(approximation.min_weighted_vertex_cover(G=graph, weight=None))
         results.append((len(graph.nodes()), len(graph.edges()), min_cover_size_found, min_cover_size_approx))
     return results
 
+def compare_backends(num_graphs: int = 50, num_nodes: int = None, edges_per_node: float = 1.5):
+    """
+    Solve the same random graphs with both backends and time them.
+
+    Input:
+    - num_graphs: How many graphs to solve.
+    - num_nodes: Number of nodes of every graph, or None for generate_random_graph instances.
+    - edges_per_node: Edges per node of the graphs of num_nodes nodes. Sparse graphs mostly vanish in the reductions,
+      so use about 3 to compare the backends on real kernels.
+
+    Output:
+    - A list of tuples (nodes, edges, ilp size, bnb size, ilp seconds, bnb seconds).
+    """
+    import networkx as nx
+    results = []
+    for _ in range(num_graphs):
+        if num_nodes is None:
+            graph = generate_random_graph()
+        else:
+            graph = nx.gnm_random_graph(num_nodes, int(edges_per_node * num_nodes))
+        start_time = timeit.default_timer()
+        ilp_size = mincover(graph, backend="ilp")
+        ilp_time = timeit.default_timer() - start_time
+        start_time = timeit.default_timer()
+        bnb_size = mincover(graph, backend="bnb")
+        bnb_time = timeit.default_timer() - start_time
+        results.append((len(graph.nodes()), len(graph.edges()), ilp_size, bnb_size, ilp_time, bnb_time))
+    return results
+
+def startup_benchmark(repeats: int = 5) -> dict:
+    """
+    Measure how long a fresh Python process takes to import this module and solve one small graph.
+
+    Input:
+    - repeats: How many fresh processes to start; the fastest run is reported.
+
+    Output:
+    - A dictionary with the seconds of a bare interpreter ("python"), of the mincover run ("mincover"),
+      and of the difference between them ("startup").
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    scripts = {
+        "python": "pass",
+        "mincover": "import mincover; mincover.mincover({0: [1, 2], 1: [0, 2], 2: [0, 1, 3], 3: [2]})",
+    }
+    timings = {}
+    for name, script in scripts.items():
+        runs = []
+        for _ in range(repeats):
+            start_time = timeit.default_timer()
+            subprocess.run([sys.executable, "-c", script], cwd=here, check=True)
+            runs.append(timeit.default_timer() - start_time)
+        timings[name] = min(runs)
+    timings["startup"] = timings["mincover"] - timings["python"]
+    return timings
+
+def ilp_build_benchmark(num_nodes: int = 2000, num_edges: int = 10000) -> dict:
+    """
+    Time the three phases of the "ilp" backend on one random bipartite graph
+    (its LP relaxation is integral, so GLPK can prove optimality in seconds).
+
+    Output:
+    - A dictionary with the seconds spent building the model ("build"),
+      compiling it for GLPK_MI ("compile") and solving it ("solve").
+    """
+    import networkx as nx
+    cvxpy = _import_ilp()
+    adj = adjacency(nx.bipartite.gnmk_random_graph(num_nodes // 2, num_nodes - num_nodes // 2, num_edges))
+    timings = {}
+    start_time = timeit.default_timer()
+    problem, x, nodes = _build_ilp(adj)
+    timings["build"] = timeit.default_timer() - start_time
+    start_time = timeit.default_timer()
+    problem.get_problem_data(cvxpy.GLPK_MI)
+    timings["compile"] = timeit.default_timer() - start_time
+    start_time = timeit.default_timer()
+    problem.solve(solver=cvxpy.GLPK_MI)
+    timings["solve"] = timeit.default_timer() - start_time
+    return timings
+
 
 if __name__ == '__main__':
     edges=eval(input())
-    graph = nx.Graph(edges)
+    graph = from_edges(edges)
     print(mincover((graph)))
+    # To see how much the reductions shrank the graph: print(kernelize(graph).report())
 
     """
     For running the test cases, uncomment the following lines.
@@ -93,4 +417,14 @@ if __name__ == '__main__':
     """
     # test_results = test_mincover()
     # for i, result in enumerate(test_results, start=1):
-    #     print(f"Graph {i}: Nodes = {result[0]}, Edges = {result[1]}, Minimum Cover Size Found = {result[2]}, Minimum Cover Size Approx = {result[3]}")
\ No newline at end of file
+    #     print(f"Graph {i}: Nodes = {result[0]}, Edges = {result[1]}, Minimum Cover Size Found = {result[2]}, Minimum Cover Size Approx = {result[3]}")
+
+    # To measure the start-up time of one mincover call in a fresh process, uncomment the following line.
+    # print(startup_benchmark())
+
+    # To see how long the "ilp" backend spends building, compiling and solving its model, uncomment the following line.
+    # print(ilp_build_benchmark())
+
+    # To compare the ILP and the branch-and-bound backends, uncomment the following lines.
+    # for nodes, edges, ilp_size, bnb_size, ilp_time, bnb_time in compare_backends():
+    #     print(f"Nodes = {nodes}, Edges = {edges}, ILP = {ilp_size} ({ilp_time:.4f}s), BnB = {bnb_size} ({bnb_time:.4f}s)")
\ No newline at end of file
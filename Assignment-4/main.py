@@ -188,6 +188,19 @@ def nearest_neighbor_tsp(distances: DistanceMatrix) -> Tuple[List[int], float]:
     return path, float(total_dist)
 
 
+def handle_query(query: str) -> OutputType:
+    """
+    Evaluate one line of input as the arguments of tsp_solver and solve it
+    (see serve.py for answering many lines).
+
+    Examples
+    -----
+    >>> handle_query("nearest_neighbor_tsp, [[0, 10, 15, 20], [10, 0, 35, 25], [15, 35, 0, 30], [20, 25, 30, 0]], ['A', 'B', 'C', 'D'], OutputTypes.PATH")
+    ['A', 'B', 'D', 'C', 'A']
+    """
+    return tsp_solver(*eval(query))
+
+
 if __name__ == '__main__':
     import doctest
     print(doctest.testmod(verbose=True))
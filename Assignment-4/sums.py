@@ -7,6 +7,7 @@
 """
 
 import heapq
+import itertools
 
 def sorted_subset_sums(S):
     """
@@ -80,9 +81,31 @@ def sorted_subset_sums(S):
                 heapq.heappush(heap, new_state)
                 seen_set.add(new_state)
 
+def evaluate_query(query: str):
+    """
+    Evaluate one line of input: an iterable expression, which may use sorted_subset_sums, takewhile and islice.
+
+    >>> list(evaluate_query("takewhile(lambda s: s < 4, sorted_subset_sums([1, 2, 5]))"))
+    [0, 1, 2, 3]
+    """
+    names = {"sorted_subset_sums": sorted_subset_sums, "takewhile": itertools.takewhile, "islice": itertools.islice}
+    return eval(query, names)
+
+
+def handle_query(query: str) -> str:
+    """
+    Evaluate one line of input and join its items as the script prints them (see serve.py).
+    The whole answer is built before it is returned, so the query must be finite.
+
+    >>> handle_query("islice(sorted_subset_sums([1, 2]), 3)")
+    '0, 1, 2, '
+    """
+    return "".join(f"{i}, " for i in evaluate_query(query))
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(verbose=True)
-    from itertools import takewhile, islice
-    for i in eval(input()):
+    # Print the items as they come, so that infinite queries still stream
+    for i in evaluate_query(input()):
         print(i, end=", ")
@@ -7,10 +7,20 @@
 """
 
 import pandas as pd
+import poll_data
+import tally
+import rank_compare
 
-codes_for_questions = pd.read_csv("https://raw.githubusercontent.com/erelsgl-at-ariel/research-5784/main/06-python-databases/homework/codes_for_questions.csv")
-codes_for_answers = pd.read_csv("https://raw.githubusercontent.com/erelsgl-at-ariel/research-5784/main/06-python-databases/homework/codes_for_answers.csv")
-list_of_answers = pd.read_csv("https://raw.githubusercontent.com/erelsgl-at-ariel/research-5784/main/06-python-databases/homework/list_of_answers.csv")
+def __getattr__(name: str) -> pd.DataFrame:
+    """
+    The tables codes_for_questions, codes_for_answers and list_of_answers are loaded by poll_data
+    on first use (from a local copy), instead of being downloaded when this module is imported.
+    They are read-only here: assigning one of them on this module only hides it, and the functions below
+    keep using poll_data's table. To analyse another table, call poll_data.set_table(name, table).
+    """
+    if name in poll_data.TABLES:
+        return poll_data.table(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Dictionary of party names and their values in the elections columns (codes_for_answers)
 parties_dictionary = {'מחל': 1, 'פה': 2, 'שס': 3, 'כן': 4, 
@@ -55,8 +65,8 @@ def support_in_one_party_elections(party: str) -> int:
     """
     party_value = parties_dictionary.get(party, 0)
     
-    # Calculate the number of supports
-    supports = (list_of_answers['Q2'] == party_value).sum()
+    # Look the party up in the tally of all parties (computed in one pass over Q2)
+    supports = tally.party_tally(poll_data.answers()).one_party(party_value)
     return supports
 
 def support_in_multi_party_elections(party: str) -> int:
@@ -97,8 +107,8 @@ def support_in_multi_party_elections(party: str) -> int:
     if not party_value:
         return 0
 
-    # Count occurrences of this value in the dynamically constructed column
-    multy_party_sum = int(list_of_answers[f'Q3_{party_value}'].sum())
+    # Look the party up in the tally of all parties (computed in one sum over the Q3_* columns)
+    multy_party_sum = tally.party_tally(poll_data.answers()).multi_party(party_value)
     return multy_party_sum
 
 def rank_parties_by_support(method):
@@ -169,22 +179,25 @@ def parties_with_different_relative_order() -> tuple:
     >>> parties_with_different_relative_order()
     ('שס', 'ג')
     """
-    rank_one_party = rank_parties_by_support(support_in_one_party_elections)
-    rank_multi_party = rank_parties_by_support(support_in_multi_party_elections)
-    
-    for party1 in parties_dictionary:
-        for party2 in parties_dictionary:
-            if party1 != party2:
-                if (rank_one_party[party1] < rank_one_party[party2] and rank_multi_party[party1] > rank_multi_party[party2]) or \
-                    (rank_one_party[party1] > rank_one_party[party2] and rank_multi_party[party1] < rank_multi_party[party2]):
-                    return (party1, party2)
-    return None
+    # The rankings of rank_parties_by_support, made once per tally and kept next to it (see tally.py)
+    party_tally = tally.party_tally(poll_data.answers())
+    rank_one_party = party_tally.ranking(parties_dictionary, 'one')
+    rank_multi_party = party_tally.ranking(parties_dictionary, 'multi')
+
+    # The first discordant pair, in the order of parties_dictionary (see rank_compare.py)
+    parties = list(parties_dictionary)
+    return rank_compare.discordant_pairs(rank_one_party[parties], rank_multi_party[parties], first_only=True)
+
+def handle_query(query: str) -> str:
+    """
+    Answer one line of input, as the script does when it is run: a party name,
+    or parties_with_different_relative_order (see serve.py for answering many lines).
+    """
+    if query == "parties_with_different_relative_order":
+        return str(parties_with_different_relative_order())
+    return f"{support_in_one_party_elections(query)} {support_in_multi_party_elections(query)}"
 
 if __name__ == '__main__':
     # import doctest
     # doctest.testmod(verbose=True)
-    party = input()
-    if party == "parties_with_different_relative_order":
-        print(parties_with_different_relative_order())
-    else:
-        print(support_in_one_party_elections(party), support_in_multi_party_elections(party))
\ No newline at end of file
+    print(handle_query(input()))
\ No newline at end of file
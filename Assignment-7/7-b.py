@@ -1,10 +1,10 @@
-import sqlite3, requests
+from functools import lru_cache
+import numpy as np
+import preferences
+import poll_db
 
-with open("poll.db", "wb") as file:
-    response = requests.get("https://github.com/erelsgl-at-ariel/research-5784/raw/main/06-python-databases/homework/poll.db")
-    file.write(response.content)
-
-db = sqlite3.connect("poll.db")
+# poll.db is opened read-only on first use, and downloaded only if there is no local copy
+# (see poll_db.py; POLL_DB_MMAP_SIZE and POLL_DB_CACHE_SIZE set its SQLite memory-map and page cache sizes)
 
 def get_candidate_column(candidate: str) -> str:
     """
@@ -18,15 +18,24 @@ def get_candidate_column(candidate: str) -> str:
     -------
     - str - The column name in the list_of_answers table for the given candidate.
     """
-    cursor = db.cursor()
-    cursor.execute("""
-    SELECT Variable
-    FROM codes_for_questions
-    WHERE Label = ?
-    """, (candidate,))
-    result = cursor.fetchone()
-    cursor.close()
-    return result[0] if result else None
+    # All labels are read once per process
+    return poll_db.database().column_for(candidate)
+
+@lru_cache(maxsize=None)
+def preference_matrix() -> tuple:
+    """
+    Load the Q6_* rank columns of all respondents once and count, for every ordered pair of candidates,
+    how many respondents prefer the first one (a lower rank), as `col1 < col2` does in SQL.
+
+    Returns
+    -------
+    - tuple - (candidates, counts): the candidates' names, and a matrix where counts[i, j] is the number
+      of respondents who prefer candidates[i] over candidates[j].
+    """
+    db = poll_db.database()
+    columns, candidates = zip(*db.query("SELECT Variable, Label FROM codes_for_questions WHERE Variable LIKE 'Q6_%'"))
+    ranks = np.array(db.query(f"SELECT {', '.join(columns)} FROM list_of_answers"), dtype=float)  # NULL becomes NaN, which never wins a comparison
+    return list(candidates), preferences.pairwise_counts(ranks.reshape(-1, len(columns)))
 
 def net_support_for_candidate1(candidate1: str, candidate2: str) -> int:
     """
@@ -61,13 +70,18 @@ def net_support_for_candidate1(candidate1: str, candidate2: str) -> int:
     >>> net_support_for_candidate1("נפתלי בנט", "יולי אדלשטיין")
     113
     """
+    # Candidates of Q6 are read from the preference matrix, anything else is counted in SQL
+    candidates, counts = preference_matrix()
+    if candidate1 in candidates and candidate2 in candidates:
+        return preferences.net_support(counts, candidates.index(candidate1), candidates.index(candidate2))
+
     column1 = get_candidate_column(candidate1)
     column2 = get_candidate_column(candidate2)
 
     if not column1 or not column2:
         raise ValueError("One or both candidates not found in the database.")
     
-    cursor = db.cursor()
+    cursor = poll_db.database().connection().cursor()
     
     # Count preferences for candidate1 over candidate2
     cursor.execute(f"""
@@ -105,32 +119,58 @@ def condorcet_winner() -> str:
     >>> condorcet_winner()
     'נפתלי בנט'
     """
-    cursor = db.cursor()
-    cursor.execute("SELECT Label FROM codes_for_questions WHERE Variable LIKE 'Q6_%'")
-    candidates = [row[0] for row in cursor.fetchall()]
-    cursor.close()
+    candidates, counts = preference_matrix()
+    winner = preferences.condorcet_winner(counts)
+    return candidates[winner] if winner is not None else "אין"
 
-    for candidate in candidates:
-        wins_all_others = True
-        for other_candidate in candidates:
-            if candidate == other_candidate:
-                continue
-            net_support = net_support_for_candidate1(candidate, other_candidate)
-            if net_support <= 0:
-                wins_all_others = False
-                break
-        if wins_all_others:
-            return candidate
+def ranking_by(method: str) -> list:
+    """
+    Rank the candidates with another voting rule, computed from the same preference matrix.
 
-    return "אין"
+    Parameters
+    ----------
+    - method: str - "copeland", "schulze" or "ranked_pairs".
 
+    Returns
+    -------
+    - list - The candidates' names, from first to last.
+
+    Examples
+    --------
+    >>> ranking_by("copeland")[0]
+    'נפתלי בנט'
+
+    >>> ranking_by("schulze")[0]
+    'נפתלי בנט'
+
+    >>> ranking_by("ranked_pairs")[0]
+    'נפתלי בנט'
+
+    >>> ranking_by("plurality")
+    Traceback (most recent call last):
+        ...
+    ValueError: Invalid method. Please choose either 'copeland', 'schulze' or 'ranked_pairs'.
+    """
+    orders = {"copeland": preferences.copeland_order, "schulze": preferences.schulze_order, "ranked_pairs": preferences.ranked_pairs_order}
+    if method not in orders:
+        raise ValueError("Invalid method. Please choose either 'copeland', 'schulze' or 'ranked_pairs'.")
+    candidates, counts = preference_matrix()
+    return [candidates[i] for i in orders[method](counts)]
+
+
+def handle_query(query: str) -> str:
+    """
+    Answer one line of input, as the script does when it is run: condorcet_winner, a ranking method,
+    or two candidates separated by a comma (see serve.py for answering many lines).
+    """
+    if query == "condorcet_winner":
+        return str(condorcet_winner())
+    if query in ("copeland", "schulze", "ranked_pairs"):
+        return str(ranking_by(query))
+    candidate1,candidate2 = query.split(",")
+    return str(net_support_for_candidate1(candidate1,candidate2))
 
 if __name__ == '__main__':
     # import doctest
     # doctest.testmod(verbose=True)
-    party = input()
-    if party == "condorcet_winner":
-        print(condorcet_winner())
-    else:
-        candidate1,candidate2 = party.split(",")
-        print(net_support_for_candidate1(candidate1,candidate2))
\ No newline at end of file
+    print(handle_query(input()))
\ No newline at end of file
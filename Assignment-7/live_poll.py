@@ -0,0 +1,91 @@
+"""
+@Author:  Tom Shabalin
+@ID:      321243339
+@Mail:    tomshabalin95@gmail.com
+@Date:    10/06/2024
+@Description: Streaming ingestion of poll responses with live party tallies and candidate preferences
+"""
+
+import numpy as np
+import pandas as pd
+import preferences
+from tally import PartyTally
+
+
+class LivePoll:
+    """
+    Running totals of a poll that receives its responses in batches. Every batch updates the Q2/Q3 party tallies
+    and the pairwise candidate preference counts in time proportional to its size, and the rankings,
+    net supports and Condorcet winner are read from these totals, without looking at older rows again.
+
+    Parameters
+    ----------
+    - `parties`: dict - Party name -> answer code (like parties_dictionary of 7-a.py).
+    - `candidates`: dict - Candidate name -> rank column (like the Q6_* columns of codes_for_questions).
+
+    Examples
+    --------
+    >>> poll = LivePoll({'A': 1, 'B': 2}, {'x': 'Q6_1', 'y': 'Q6_2'})
+    >>> poll.ingest([{'Q2': 1, 'Q3_1': 1, 'Q3_2': 1, 'Q6_1': 2, 'Q6_2': 1}])
+    >>> poll.ingest(pd.DataFrame({'Q2': [2, 2], 'Q3_1': [0, 0], 'Q3_2': [1, 0], 'Q6_1': [1, 2], 'Q6_2': [2, 1]}))
+    >>> poll.respondents, poll.one_party_support('B'), poll.multi_party_support('B')
+    (3, 2, 2)
+    >>> poll.ranking('one').to_dict()
+    {'B': 1, 'A': 2}
+    >>> poll.net_support('y', 'x'), poll.condorcet_winner()
+    (1, 'y')
+    """
+
+    def __init__(self, parties: dict, candidates: dict):
+        self.parties = dict(parties)
+        self.candidates = list(candidates)
+        self.rank_columns = [candidates[candidate] for candidate in self.candidates]
+        self.tally = PartyTally({}, {})
+        self.preference_counts = np.zeros((len(self.candidates), len(self.candidates)), dtype=np.int64)
+        self.respondents = 0
+
+    def ingest(self, rows) -> None:
+        """
+        Add a batch of new respondents.
+
+        Parameters
+        ----------
+        - `rows`: A DataFrame, or a list of dicts, with the respondents' answers (Q2, Q3_*, and the rank columns).
+          Missing columns or values count as unanswered.
+        """
+        batch = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+        self.respondents += len(batch)
+        self.tally += PartyTally.from_answers(batch)
+        ranks = batch.reindex(columns=self.rank_columns).to_numpy(dtype=float, na_value=np.nan)
+        self.preference_counts += preferences.pairwise_counts(ranks)
+
+    def one_party_support(self, party: str) -> int:
+        """The current number of supports of party in one-party elections (Q2)."""
+        return self.tally.one_party(self.parties.get(party, 0))
+
+    def multi_party_support(self, party: str) -> int:
+        """The current number of supports of party in multi-party elections (Q3_*)."""
+        return self.tally.multi_party(self.parties.get(party, 0))
+
+    def ranking(self, method: str = 'one') -> pd.Series:
+        """
+        The current rank of every party, by 'one'-party or 'multi'-party support (as rank_parties_by_support of 7-a.py).
+        """
+        # Every batch makes a new tally, so the ranking is computed at most once per batch
+        return self.tally.ranking(self.parties, method)
+
+    def net_support(self, candidate1: str, candidate2: str) -> int:
+        """The current net support for candidate1 over candidate2."""
+        if candidate1 not in self.candidates or candidate2 not in self.candidates:
+            raise ValueError("One or both candidates not found in the poll.")
+        return preferences.net_support(self.preference_counts, self.candidates.index(candidate1), self.candidates.index(candidate2))
+
+    def condorcet_winner(self) -> str:
+        """The current Condorcet winner, or None."""
+        winner = preferences.condorcet_winner(self.preference_counts)
+        return None if winner is None else self.candidates[winner]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,12 @@
+"""
+@Author:  Tom Shabalin
+@ID:      321243339
+@Mail:    tomshabalin95@gmail.com
+@Date:    10/06/2024
+@Description: Settings shared by the poll data layers (poll_data.py for the CSV tables, poll_db.py for poll.db)
+"""
+
+import os
+
+# Where the poll data lives (POLL_DATA_DIR, or the data folder next to this file)
+DATA_DIR = os.environ.get("POLL_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
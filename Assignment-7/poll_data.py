@@ -0,0 +1,250 @@
+"""
+@Author:  Tom Shabalin
+@ID:      321243339
+@Mail:    tomshabalin95@gmail.com
+@Date:    10/06/2024
+@Description: Local, lazily loaded data layer for the public opinion poll tables
+"""
+
+from importlib.util import find_spec
+import json
+import os
+import pandas as pd
+from poll_config import DATA_DIR
+
+BASE_URL = "https://raw.githubusercontent.com/erelsgl-at-ariel/research-5784/main/06-python-databases/homework/"
+TABLES = ("codes_for_questions", "codes_for_answers", "list_of_answers")
+
+# The columns the party analysis needs, and the compact types they are stored in:
+# answer codes fit in a (nullable) int8 and the Q3_* flags are booleans
+ANSWER_DTYPES = {'Q2': 'Int8', **{f'Q3_{code}': 'boolean' for code in range(1, 18)}}
+
+# Rows per chunk when answers() reads the CSV file, which bounds the parser's memory on very large files
+ANSWER_CHUNK_ROWS = 100_000
+
+# Tables already loaded in this process
+_tables = {}
+
+# The compact answers table, and the list_of_answers object, shape and version it was made from
+_answers = {}
+
+# Bumped whenever list_of_answers may have changed in a way its shape does not show (see changed())
+_version = 0
+
+
+def data_dir() -> str:
+    """The directory the poll tables are read from, and where their typed snapshots are kept (see poll_config.DATA_DIR)."""
+    return DATA_DIR
+
+
+def _snapshot_format() -> str:
+    # Feather keeps the column types and loads in milliseconds, but needs pyarrow
+    return "feather" if find_spec("pyarrow") is not None else "pickle"
+
+
+def _source_stamp(path: str) -> dict:
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def download(name: str, directory: str = None) -> str:
+    """
+    Download one table as CSV into the data directory.
+
+    Parameters
+    ----------
+    - `name`: str - The table's name, one of TABLES.
+    - `directory`: str - Where to save it (data_dir() by default).
+
+    Returns
+    -------
+    - `str`: The path of the CSV file.
+    """
+    directory = directory or data_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.csv")
+    pd.read_csv(BASE_URL + f"{name}.csv").to_csv(path, index=False)
+    return path
+
+
+def _local_csv(name: str, directory: str) -> str:
+    csv_path = os.path.join(directory, f"{name}.csv")
+    if not os.path.exists(csv_path):
+        try:
+            download(name, directory)
+        except OSError as error:
+            raise FileNotFoundError(f"{csv_path} does not exist and could not be downloaded ({error}). "
+                                    f"Copy {name}.csv into {directory} or set POLL_DATA_DIR.") from None
+    return csv_path
+
+
+def _read_snapshot(name: str, directory: str, meta_check: dict) -> pd.DataFrame:
+    """The snapshot of name if its meta data matches meta_check (for example the stamp of its source), else None."""
+    cache_dir = os.path.join(directory, ".cache")
+    try:
+        with open(os.path.join(cache_dir, f"{name}.json"), encoding="utf-8") as file:
+            meta = json.load(file)
+        if all(meta.get(key) == value for key, value in meta_check.items()):
+            snapshot_path = os.path.join(cache_dir, f"{name}.{meta['format']}")
+            if meta["format"] == "feather":
+                return pd.read_feather(snapshot_path)
+            return pd.read_pickle(snapshot_path)
+    except (OSError, ValueError, KeyError, ImportError):
+        pass
+    return None
+
+
+def _write_snapshot(name: str, directory: str, table: pd.DataFrame, meta: dict) -> None:
+    cache_dir = os.path.join(directory, ".cache")
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        snapshot_format = _snapshot_format()
+        snapshot_path = os.path.join(cache_dir, f"{name}.{snapshot_format}")
+        if snapshot_format == "feather":
+            table.to_feather(snapshot_path)
+        else:
+            table.to_pickle(snapshot_path)
+        with open(os.path.join(cache_dir, f"{name}.json"), "w", encoding="utf-8") as file:
+            json.dump({**meta, "format": snapshot_format}, file)
+    except OSError:
+        # A read-only data directory only costs us the faster next start
+        pass
+
+
+def _load(name: str, directory: str) -> pd.DataFrame:
+    csv_path = _local_csv(name, directory)
+
+    # Use the snapshot if it was made from this very version of the CSV file
+    stamp = _source_stamp(csv_path)
+    table = _read_snapshot(name, directory, {"source": stamp})
+    if table is None:
+        table = pd.read_csv(csv_path)
+        _write_snapshot(name, directory, table, {"source": stamp})
+    return table
+
+
+def table(name: str) -> pd.DataFrame:
+    """
+    Get one of the poll tables. It is loaded on first use: from the typed snapshot if it is
+    up to date with the CSV file (same mtime and size), otherwise from the CSV file, which is
+    downloaded first if it is not in the data directory yet.
+
+    Parameters
+    ----------
+    - `name`: str - The table's name, one of TABLES.
+
+    Returns
+    -------
+    - `pd.DataFrame`: The table.
+    """
+    if name not in TABLES:
+        raise ValueError(f"Unknown table {name!r}. Please choose one of {list(TABLES)}.")
+    if name not in _tables:
+        _tables[name] = _load(name, data_dir())
+    return _tables[name]
+
+
+def set_table(name: str, new_table: pd.DataFrame) -> None:
+    """
+    Use new_table as the poll table name from now on (instead of the local file), and mark the tables
+    as changed, so that the compact answers and the tallies are made from it.
+
+    >>> set_table("codes_for_answers", pd.DataFrame({"Variable": ["Q2"]}))
+    >>> table("codes_for_answers")["Variable"].tolist()
+    ['Q2']
+    >>> reload()
+    """
+    if name not in TABLES:
+        raise ValueError(f"Unknown table {name!r}. Please choose one of {list(TABLES)}.")
+    _tables[name] = new_table
+    changed()
+
+
+def read_answers(path: str = None, dtypes: dict = None, chunksize: int = None):
+    """
+    Read only the needed columns of list_of_answers, in compact types.
+
+    Parameters
+    ----------
+    - `path`: str - The CSV file (list_of_answers.csv in the data directory by default).
+    - `dtypes`: dict - The columns to read and their types (ANSWER_DTYPES by default).
+    - `chunksize`: int - If given, return an iterator of DataFrames of this many rows,
+      so that files larger than memory can be processed chunk by chunk.
+
+    Returns
+    -------
+    - `pd.DataFrame`: The table, or an iterator of its chunks.
+
+    Examples
+    --------
+    >>> import io
+    >>> answers = read_answers(io.StringIO("ID,Q2,Q3_1,Q4\\n1,3,1,x\\n2,,0,y\\n"), dtypes={'Q2': 'Int8', 'Q3_1': 'boolean'})
+    >>> [str(dtype) for dtype in answers.dtypes]
+    ['Int8', 'boolean']
+    >>> [len(chunk) for chunk in read_answers(io.StringIO("Q2\\n1\\n2\\n3\\n"), dtypes={'Q2': 'Int8'}, chunksize=2)]
+    [2, 1]
+    """
+    path = path or _local_csv("list_of_answers", data_dir())
+    dtypes = ANSWER_DTYPES if dtypes is None else dtypes
+    return pd.read_csv(path, usecols=lambda column: column in dtypes, dtype=dtypes, chunksize=chunksize)
+
+
+def compact(answers: pd.DataFrame, dtypes: dict = None) -> pd.DataFrame:
+    """
+    The columns of answers that are in dtypes, in those types (ANSWER_DTYPES by default).
+
+    >>> [str(dtype) for dtype in compact(pd.DataFrame({'ID': [1], 'Q2': [3.0], 'Q3_1': [1]})).dtypes]
+    ['Int8', 'boolean']
+    """
+    dtypes = ANSWER_DTYPES if dtypes is None else dtypes
+    columns = {column: dtype for column, dtype in dtypes.items() if column in answers.columns}
+    return answers[list(columns)].astype(columns)
+
+
+def version() -> int:
+    """A counter that changes whenever the poll tables are reloaded or marked as changed."""
+    return _version
+
+
+def changed() -> None:
+    """
+    Record that list_of_answers was changed in place (for example values overwritten), so that answers()
+    and the tallies made from it are made again. Replacing the table or changing its shape needs no call.
+    """
+    global _version
+    _version += 1
+
+
+def answers() -> pd.DataFrame:
+    """
+    The compact table of list_of_answers (see compact). It is made again whenever list_of_answers is
+    another object, has another shape, or version() changed since it was made.
+    If list_of_answers is loaded in this process, it is made from that very table. Otherwise it is read
+    from its own snapshot, stamped with the mtime and size of the CSV file, or, when that is out of date,
+    from the CSV file with read_answers (only the needed columns, in chunks), without loading the full table.
+    """
+    source = _tables.get("list_of_answers")
+    key = (None if source is None else source.shape, _version)
+    if "table" not in _answers or _answers["source"] is not source or _answers["key"] != key:
+        if source is not None:
+            compact_answers = compact(source)
+        else:
+            directory = data_dir()
+            meta = {"source": _source_stamp(_local_csv("list_of_answers", directory)), "dtypes": ANSWER_DTYPES}
+            compact_answers = _read_snapshot("answers", directory, meta)
+            if compact_answers is None:
+                chunks = read_answers(chunksize=ANSWER_CHUNK_ROWS)
+                compact_answers = pd.concat(chunks, ignore_index=True)
+                _write_snapshot("answers", directory, compact_answers, meta)
+        _answers.update(source=source, key=key, table=compact_answers)
+    return _answers["table"]
+
+
+def reload() -> None:
+    """
+    Forget the loaded tables, the compact answers included, so that the next table() call reads them again
+    (tallies of the old tables are not reused, since they belong to another DataFrame).
+    """
+    _tables.clear()
+    _answers.clear()
+    changed()
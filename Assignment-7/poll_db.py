@@ -0,0 +1,150 @@
+"""
+@Author:  Tom Shabalin
+@ID:      321243339
+@Mail:    tomshabalin95@gmail.com
+@Date:    10/06/2024
+@Description: Read-only, thread-local access to the poll.db SQLite database
+"""
+
+import os
+import pathlib
+import sqlite3
+import tempfile
+import threading
+from poll_config import DATA_DIR
+
+DB_URL = "https://github.com/erelsgl-at-ariel/research-5784/raw/main/06-python-databases/homework/poll.db"
+
+# The default SQLite settings of every connection, which POLL_DB_MMAP_SIZE and POLL_DB_CACHE_SIZE override
+MMAP_SIZE = int(os.environ.get("POLL_DB_MMAP_SIZE", 256 * 1024 * 1024))
+CACHE_SIZE = int(os.environ.get("POLL_DB_CACHE_SIZE", -64 * 1024))
+
+
+class PollDatabase:
+    """
+    A local poll.db opened read-only and immutable, with one connection per thread, so that many threads
+    can query it at once without sharing a connection or taking SQLite's locks.
+
+    Parameters
+    ----------
+    - path: str - The database file (poll.db in the data directory by default). It is downloaded on first use if missing.
+    - mmap_size: int - Bytes of the file SQLite may memory-map (PRAGMA mmap_size), MMAP_SIZE by default.
+    - cache_size: int - Page cache of every connection, in pages, or in KiB if negative (PRAGMA cache_size),
+      CACHE_SIZE by default.
+
+    Examples
+    --------
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "poll.db")
+    >>> with sqlite3.connect(path) as setup:
+    ...     _ = setup.execute("CREATE TABLE codes_for_questions (Variable TEXT, Label TEXT)")
+    ...     _ = setup.execute("INSERT INTO codes_for_questions VALUES ('Q6_1', 'a'), ('Q6_2', 'b')")
+    >>> db = PollDatabase(path)
+    >>> db.column_for('b'), db.column_for('c')
+    ('Q6_2', None)
+    >>> db.query("SELECT COUNT(*) FROM codes_for_questions")
+    [(2,)]
+    >>> db.connection().execute("DELETE FROM codes_for_questions")
+    Traceback (most recent call last):
+    ...
+    sqlite3.OperationalError: attempt to write a readonly database
+    """
+
+    def __init__(self, path: str = None, mmap_size: int = None, cache_size: int = None):
+        self.path = path or os.path.join(DATA_DIR, "poll.db")
+        self.mmap_size = int(MMAP_SIZE if mmap_size is None else mmap_size)
+        self.cache_size = int(CACHE_SIZE if cache_size is None else cache_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._download_lock = threading.Lock()
+        self._columns = None
+
+    def ensure_local(self) -> str:
+        """
+        Download the database if there is no local copy yet, and return its path.
+        Threads that get here together download it once: the others wait for the lock and find the file.
+        """
+        if not os.path.exists(self.path):
+            with self._download_lock:
+                if not os.path.exists(self.path):
+                    self._download()
+        return self.path
+
+    def _download(self) -> None:
+        import requests
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        response = requests.get(DB_URL)
+        response.raise_for_status()
+        # A temporary file of our own in the same directory, so that os.replace is atomic and no other process writes it
+        handle, temporary = tempfile.mkstemp(prefix="poll.db.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(response.content)
+            os.replace(temporary, self.path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+            raise
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            uri = pathlib.Path(self.ensure_local()).resolve().as_uri() + "?mode=ro&immutable=1"
+            connection = sqlite3.connect(uri, uri=True)
+            connection.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+            connection.execute(f"PRAGMA cache_size = {self.cache_size}")
+            self._local.connection = connection
+        return connection
+
+    def query(self, sql: str, parameters: tuple = ()) -> list:
+        """Run one statement on this thread's connection and return all of its rows."""
+        return self.connection().execute(sql, parameters).fetchall()
+
+    def column_for(self, label: str) -> str:
+        """
+        The column of list_of_answers whose label in codes_for_questions is label, or None.
+        All labels are read with one query, the first time this is called in the process.
+        """
+        if self._columns is None:
+            with self._lock:
+                if self._columns is None:
+                    columns = {}
+                    for variable, question_label in self.query("SELECT Variable, Label FROM codes_for_questions"):
+                        columns.setdefault(question_label, variable)
+                    self._columns = columns
+        return self._columns.get(label)
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+_database = None
+_database_lock = threading.Lock()
+
+
+def database(mmap_size: int = None, cache_size: int = None) -> PollDatabase:
+    """
+    The PollDatabase of this process. The first call creates it, with the given settings
+    (see PollDatabase; None keeps the default); later calls can only ask for the same settings,
+    since the connections of other threads are already open.
+    """
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = PollDatabase(mmap_size=mmap_size, cache_size=cache_size)
+    for name, value in (("mmap_size", mmap_size), ("cache_size", cache_size)):
+        if value is not None and int(value) != getattr(_database, name):
+            raise ValueError(f"The poll database is already open with {name}={getattr(_database, name)}.")
+    return _database
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
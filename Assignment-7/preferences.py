@@ -0,0 +1,133 @@
+"""
+@Author:  Tom Shabalin
+@ID:      321243339
+@Mail:    tomshabalin95@gmail.com
+@Date:    10/06/2024
+@Description: Pairwise preference counts of candidates from their rank columns
+"""
+
+import numpy as np
+
+# Rows compared at once, so that the respondents x candidates x candidates comparison stays small
+CHUNK_ROWS = 10000
+
+
+def pairwise_counts(ranks: np.ndarray) -> np.ndarray:
+    """
+    Count, for every ordered pair of candidates, how many respondents rank the first above the second.
+
+    Parameters
+    ----------
+    - `ranks`: np.ndarray - One row per respondent and one column per candidate; a lower rank is preferred,
+      and NaN (no answer) never beats and is never beaten, like NULL in SQL.
+
+    Returns
+    -------
+    - `np.ndarray`: A candidates x candidates matrix, where [i, j] is the number of respondents who prefer i over j.
+
+    Examples
+    --------
+    >>> pairwise_counts(np.array([[1, 2, 3], [2, 1, 3], [1, 3, np.nan]]))
+    array([[0, 2, 2],
+           [1, 0, 2],
+           [0, 0, 0]])
+    """
+    ranks = np.asarray(ranks, dtype=float)
+    counts = np.zeros((ranks.shape[1], ranks.shape[1]), dtype=np.int64)
+    for start in range(0, len(ranks), CHUNK_ROWS):
+        chunk = ranks[start:start + CHUNK_ROWS]
+        counts += (chunk[:, :, None] < chunk[:, None, :]).sum(axis=0)
+    return counts
+
+
+def net_support(counts: np.ndarray, i: int, j: int) -> int:
+    """
+    The number of respondents who prefer candidate i over j, minus those who prefer j over i.
+
+    >>> net_support(np.array([[0, 5], [3, 0]]), 0, 1)
+    2
+    """
+    return int(counts[i, j] - counts[j, i])
+
+
+def condorcet_winner(counts: np.ndarray) -> int:
+    """
+    The index of the candidate who beats every other candidate head to head, or None.
+
+    >>> condorcet_winner(np.array([[0, 5, 4], [3, 0, 6], [4, 2, 0]]))
+    >>> condorcet_winner(np.array([[0, 5, 5], [3, 0, 6], [4, 2, 0]]))
+    0
+    """
+    net = counts - counts.T
+    np.fill_diagonal(net, 1)
+    winners = np.flatnonzero((net > 0).all(axis=1))
+    return int(winners[0]) if len(winners) else None
+
+
+def copeland_scores(counts: np.ndarray) -> np.ndarray:
+    """
+    Copeland score of every candidate: 1 for every head-to-head win and 1/2 for every tie.
+
+    >>> copeland_scores(np.array([[0, 5, 4], [3, 0, 6], [4, 2, 0]]))
+    array([1.5, 1. , 0.5])
+    """
+    net = counts - counts.T
+    np.fill_diagonal(net, 0)
+    ties = (net == 0).sum(axis=1) - 1
+    return (net > 0).sum(axis=1) + ties / 2
+
+
+def copeland_order(counts: np.ndarray) -> list:
+    """
+    Candidate indices from the highest Copeland score to the lowest (ties keep the original order).
+
+    >>> copeland_order(np.array([[0, 5, 4], [3, 0, 6], [4, 2, 0]]))
+    [0, 1, 2]
+    """
+    return np.argsort(-copeland_scores(counts), kind='stable').tolist()
+
+
+def schulze_order(counts: np.ndarray) -> list:
+    """
+    Candidate indices in the Schulze order: i comes before j if the strongest path from i to j
+    is stronger than the strongest path from j to i (candidates are ordered by how many others they beat that way).
+
+    >>> schulze_order(np.array([[0, 5, 4], [3, 0, 6], [4, 2, 0]]))
+    [0, 1, 2]
+    """
+    strength = np.where(counts > counts.T, counts, 0)
+    for k in range(len(counts)):
+        # Widest path through k, for all pairs at once
+        strength = np.maximum(strength, np.minimum(strength[:, k, None], strength[None, k, :]))
+    np.fill_diagonal(strength, 0)
+    wins = (strength > strength.T).sum(axis=1)
+    return np.argsort(-wins, kind='stable').tolist()
+
+
+def ranked_pairs_order(counts: np.ndarray) -> list:
+    """
+    Candidate indices in the ranked pairs (Tideman) order: the head-to-head wins are locked in
+    from the largest margin down, skipping any that would close a cycle.
+
+    >>> ranked_pairs_order(np.array([[0, 5, 4], [3, 0, 6], [4, 2, 0]]))
+    [0, 1, 2]
+    """
+    size = len(counts)
+    margins = counts - counts.T
+    pairs = [(i, j) for i in range(size) for j in range(size) if margins[i, j] > 0]
+    pairs.sort(key=lambda pair: (-margins[pair], -counts[pair]))
+    locked = np.zeros((size, size), dtype=bool)
+    reaches = np.eye(size, dtype=bool)  # reaches[i, j]: there is a locked path from i to j
+    for i, j in pairs:
+        if not reaches[j, i]:
+            locked[i, j] = True
+            # Everything that reaches i now reaches everything that j reaches
+            reaches |= reaches[:, i, None] & reaches[None, j, :]
+
+    # Topological order of the locked graph, taking the lowest index among the sources each time
+    order, remaining = [], list(range(size))
+    while remaining:
+        source = next(i for i in remaining if not locked[remaining, i].any())
+        order.append(source)
+        remaining.remove(source)
+    return order
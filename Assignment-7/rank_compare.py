@@ -0,0 +1,153 @@
+"""
+@Author:  Tom Shabalin
+@ID:      321243339
+@Mail:    tomshabalin95@gmail.com
+@Date:    10/06/2024
+@Description: Comparing two rankings of the same items with a merge-sort inversion count
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _as_arrays(rank_a, rank_b) -> tuple:
+    """
+    Turn two rankings into (labels, a, b). Series are aligned by label, in the order of rank_a;
+    plain sequences are labelled 0..p-1.
+    """
+    if isinstance(rank_a, pd.Series):
+        labels = list(rank_a.index)
+        b = rank_b.reindex(rank_a.index) if isinstance(rank_b, pd.Series) else rank_b
+        return labels, rank_a.to_numpy(), np.asarray(b)
+    a = np.asarray(rank_a)
+    return list(range(len(a))), a, np.asarray(rank_b)
+
+
+def _merge_count(a: np.ndarray, b: np.ndarray, collect: bool = False) -> tuple:
+    """
+    Bottom-up merge sort of the items by b, after ordering them by a (ties in a broken by b,
+    so that they never count as inversions). Every pass merges all pairs of runs at once with NumPy:
+    an item's key is (its pair of runs, its rank in b), so one searchsorted over all the right runs
+    counts, for every item of a left run, the items of its right run that are smaller in b, and
+    the other way around. The binary searches and the stable argsort that merges the runs cost
+    O(p log p) per pass instead of the O(p) of a sequential merge, so the log p passes take O(p log² p).
+
+    Output:
+    - A tuple (discordant, pairs): discordant[i] is the number of items j with a and b in opposite strict
+      order to item i; pairs is the list of all discordant pairs (i, j) if collect is set, otherwise None.
+    """
+    n = len(a)
+    order = np.lexsort((b, a))
+    rank = np.unique(b, return_inverse=True)[1].reshape(-1).astype(np.int64)
+    smaller_after = np.zeros(n, dtype=np.int64)
+    greater_before = np.zeros(n, dtype=np.int64)
+    pairs = [] if collect else None
+    position = np.arange(n)
+    width = 1
+    while width < n:
+        run_pair = position // (2 * width)
+        left = position // width % 2 == 0
+        key = run_pair * (n + 1) + rank[order]
+        # Both are sorted: the runs come in order, and every run is sorted by rank
+        left_keys, right_keys = key[left], key[~left]
+        left_items, right_items = order[left], order[~left]
+
+        # For every left item, the right items of its pair that come after it in a and are strictly smaller in b
+        right_start = np.searchsorted(right_keys, run_pair[left] * (n + 1))
+        smaller = np.searchsorted(right_keys, left_keys) - right_start
+        smaller_after[left_items] += smaller
+        # For every right item, the left items of its pair that come before it in a and are strictly greater in b
+        left_end = np.searchsorted(left_keys, (run_pair[~left] + 1) * (n + 1))
+        greater_before[right_items] += left_end - np.searchsorted(left_keys, right_keys, side="right")
+
+        if collect and smaller.any():
+            # The smaller right items of a left item are the first ones of its right run
+            offsets = np.arange(smaller.sum()) - np.repeat(np.cumsum(smaller) - smaller, smaller)
+            partners = right_items[np.repeat(right_start, smaller) + offsets]
+            pairs.extend(zip(np.repeat(left_items, smaller).tolist(), partners.tolist()))
+
+        order = order[np.argsort(key, kind="stable")]
+        width *= 2
+    discordant = (smaller_after + greater_before).tolist()
+    return discordant, pairs
+
+
+def discordant_pairs(rank_a, rank_b, first_only: bool = False):
+    """
+    Find the pairs of items whose relative order is different in the two rankings
+    (ties are never discordant), in O(p log² p + number of pairs) (see _merge_count).
+
+    Parameters
+    ----------
+    - `rank_a`, `rank_b`: The two rankings: Series of ranks indexed by item, or sequences of ranks.
+    - `first_only`: bool - Return only the first pair, in the order of a double loop over the items of rank_a.
+
+    Returns
+    -------
+    - With first_only, the first pair (item1, item2) or `None`; otherwise the list of all pairs (item1, item2),
+      with item1 before item2 in rank_a's order.
+
+    Examples
+    --------
+    >>> a = pd.Series({'x': 1, 'y': 2, 'z': 3, 'w': 4})
+    >>> b = pd.Series({'x': 1, 'y': 3, 'z': 2, 'w': 4})
+    >>> discordant_pairs(a, b)
+    [('y', 'z')]
+    >>> discordant_pairs([1, 2, 3], [3, 2, 1], first_only=True)
+    (0, 1)
+    >>> discordant_pairs([1, 2, 3], [3, 2, 1])
+    [(0, 1), (0, 2), (1, 2)]
+    >>> discordant_pairs([1, 2, 3], [1, 2, 3], first_only=True) is None
+    True
+    """
+    labels, a, b = _as_arrays(rank_a, rank_b)
+    if first_only:
+        discordant, _ = _merge_count(a, b)
+        first = next((i for i, count in enumerate(discordant) if count), None)
+        if first is None:
+            return None
+        second = next(j for j in range(len(labels))
+                      if (a[first] < a[j] and b[first] > b[j]) or (a[first] > a[j] and b[first] < b[j]))
+        return (labels[first], labels[second])
+    _, pairs = _merge_count(a, b, collect=True)
+    return [(labels[i], labels[j]) for i, j in sorted(tuple(sorted(pair)) for pair in pairs)]
+
+
+def kendall_tau_distance(rank_a, rank_b) -> int:
+    """
+    The number of discordant pairs of the two rankings.
+
+    >>> kendall_tau_distance([1, 2, 3, 4], [4, 3, 2, 1])
+    6
+    """
+    _, a, b = _as_arrays(rank_a, rank_b)
+    discordant, _ = _merge_count(a, b)
+    return sum(discordant) // 2
+
+
+def kendall_tau(rank_a, rank_b) -> float:
+    """
+    Kendall's tau-a: 1 for the same order, -1 for opposite orders.
+
+    >>> kendall_tau([1, 2, 3, 4], [1, 2, 4, 3])
+    0.6666666666666667
+    """
+    _, a, _ = _as_arrays(rank_a, rank_b)
+    num_pairs = len(a) * (len(a) - 1) // 2
+    return 1 - 2 * kendall_tau_distance(rank_a, rank_b) / num_pairs if num_pairs else 1.0
+
+
+def footrule_distance(rank_a, rank_b) -> int:
+    """
+    Spearman's footrule: the sum of the absolute differences between the two ranks of every item.
+
+    >>> footrule_distance([1, 2, 3, 4], [4, 3, 2, 1])
+    8
+    """
+    _, a, b = _as_arrays(rank_a, rank_b)
+    return int(np.abs(a - b).sum())
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
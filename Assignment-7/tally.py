@@ -0,0 +1,135 @@
+"""
+@Author:  Tom Shabalin
+@ID:      321243339
+@Mail:    tomshabalin95@gmail.com
+@Date:    10/06/2024
+@Description: Single-pass support counts of all parties in the public opinion poll
+"""
+
+import pandas as pd
+import poll_data
+
+NUM_PARTIES = 17
+
+
+class PartyTally:
+    """
+    The support count of every party code in one-party elections (Q2) and multi-party elections (Q3_*).
+
+    Examples
+    --------
+    >>> answers = pd.DataFrame({'Q2': [1, 2, 2, 3], 'Q3_1': [1, 0, 1, 1], 'Q3_2': [0, 1, 1, 0]})
+    >>> t = PartyTally.from_answers(answers)
+    >>> t.one_party(2), t.one_party(4), t.multi_party(1), t.multi_party(2), t.multi_party(5)
+    (2, 0, 3, 2, 0)
+    """
+
+    def __init__(self, one_party_counts: dict, multi_party_counts: dict):
+        self.one_party_counts = one_party_counts
+        self.multi_party_counts = multi_party_counts
+        self._rankings = {}
+
+    @classmethod
+    def from_answers(cls, answers: pd.DataFrame, num_parties: int = NUM_PARTIES) -> "PartyTally":
+        """
+        Count everything with one value_counts over Q2 and one column-wise sum over the Q3_* columns.
+        """
+        one_party_counts = {}
+        if 'Q2' in answers.columns:
+            one_party_counts = {int(code): int(count) for code, count in answers['Q2'].value_counts().items()}
+        columns = [f'Q3_{code}' for code in range(1, num_parties + 1) if f'Q3_{code}' in answers.columns]
+        multi_party_counts = {int(column[3:]): int(count) for column, count in answers[columns].sum().items()}
+        return cls(one_party_counts, multi_party_counts)
+
+    @classmethod
+    def from_chunks(cls, chunks, num_parties: int = NUM_PARTIES) -> "PartyTally":
+        """
+        Tally a table given as an iterator of chunks (for example poll_data.read_answers(chunksize=...)),
+        keeping only one chunk in memory at a time.
+
+        >>> chunks = [pd.DataFrame({'Q2': [1, 2], 'Q3_1': [1, 1]}), pd.DataFrame({'Q2': [2], 'Q3_1': [0]})]
+        >>> t = PartyTally.from_chunks(chunks)
+        >>> t.one_party(2), t.multi_party(1)
+        (2, 2)
+        """
+        total = cls({}, {})
+        for chunk in chunks:
+            total += cls.from_answers(chunk, num_parties)
+        return total
+
+    def __add__(self, other: "PartyTally") -> "PartyTally":
+        one_party_counts, multi_party_counts = dict(self.one_party_counts), dict(self.multi_party_counts)
+        for code, count in other.one_party_counts.items():
+            one_party_counts[code] = one_party_counts.get(code, 0) + count
+        for code, count in other.multi_party_counts.items():
+            multi_party_counts[code] = multi_party_counts.get(code, 0) + count
+        return PartyTally(one_party_counts, multi_party_counts)
+
+    def one_party(self, code: int) -> int:
+        """The number of respondents whose Q2 answer is code."""
+        return self.one_party_counts.get(code, 0)
+
+    def multi_party(self, code: int) -> int:
+        """The number of respondents who marked Q3_code."""
+        return self.multi_party_counts.get(code, 0)
+
+    def ranking(self, parties: dict, method: str = 'one') -> pd.Series:
+        """
+        The rank of every party (name -> code) by 'one'-party or 'multi'-party support, 1 for the most supported
+        and ties in the order of parties. It is computed once per tally and parties, and every call
+        returns its own copy, so that changing it never changes what later calls get.
+
+        >>> t = PartyTally({1: 5, 2: 7}, {1: 9, 2: 3})
+        >>> t.ranking({'A': 1, 'B': 2}).to_dict(), t.ranking({'A': 1, 'B': 2}, 'multi').to_dict()
+        ({'B': 1, 'A': 2}, {'A': 1, 'B': 2})
+        >>> ranking = t.ranking({'A': 1, 'B': 2})
+        >>> ranking['A'] = 99
+        >>> int(t.ranking({'A': 1, 'B': 2})['A'])
+        2
+        """
+        if method not in ('one', 'multi'):
+            raise ValueError("Invalid method. Please choose either 'one' or 'multi'.")
+        key = (method, tuple(parties.items()))
+        if key not in self._rankings:
+            count = self.one_party if method == 'one' else self.multi_party
+            supports = {party: count(code) for party, code in parties.items()}
+            sorted_parties = sorted(supports, key=supports.get, reverse=True)
+            self._rankings[key] = pd.Series({party: rank for rank, party in enumerate(sorted_parties, 1)})
+        return self._rankings[key].copy()
+
+
+# The last answers table that was tallied, its shape, the poll_data version, and its tally
+_memo = {}
+
+
+def party_tally(answers: pd.DataFrame) -> PartyTally:
+    """
+    The PartyTally of answers, computed once and reused while answers is the same object, with the same shape,
+    and poll_data.version() is unchanged. For the poll itself pass poll_data.answers(): it is a new table
+    whenever list_of_answers is replaced or changes shape, so those changes are picked up by themselves;
+    after changing values of list_of_answers in place, call invalidate().
+
+    >>> answers = pd.DataFrame({'Q2': [1, 1], 'Q3_1': [1, 0]})
+    >>> party_tally(answers) is party_tally(answers)
+    True
+    >>> party_tally(pd.DataFrame({'Q2': [1], 'Q3_1': [1]})).one_party(1)
+    1
+    """
+    key = (answers.shape, poll_data.version())
+    if _memo.get('answers') is not answers or _memo.get('key') != key:
+        _memo.update(answers=answers, key=key, tally=PartyTally.from_answers(answers))
+    return _memo['tally']
+
+
+def invalidate() -> None:
+    """
+    Forget the memoized tally, and mark list_of_answers as changed (see poll_data.changed()),
+    so that poll_data's compact answers table and the tally are both made again.
+    """
+    _memo.clear()
+    poll_data.changed()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,217 @@
+"""
+@Author:  Tom Shabalin
+@ID:      321243339
+@Mail:    tomshabalin95@gmail.com
+@Date:    10/06/2024
+@Description: Persistent batch/server mode for the assignment scripts that read one query from input()
+
+Every script with a handle_query(line) function (7-a.py, 7-b.py, sums.py, deepsort.py, Assignment-4/main.py)
+can be loaded once and asked many queries over the same warm state (imports, loaded tables, cached matrices):
+
+    $ python serve.py Assignment-7/7-b.py < queries.txt
+    $ python serve.py Assignment-4/sums.py --socket /tmp/sums.sock --workers 8
+
+Requests are newline-delimited and answered one line each, in the order they were sent, while up to
+`workers` of them run at once. The line ":stats" answers with the latency percentiles so far,
+which are also written to stderr when the input ends.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# The handler of the loaded script (in this process, or in every worker process)
+_handle = None
+
+
+def load_handler(path: str):
+    """
+    Import a script by its path (its folder is put on sys.path, for its sibling modules)
+    and return its handle_query function.
+    """
+    path = os.path.abspath(path)
+    sys.path.insert(0, os.path.dirname(path))
+    name = os.path.splitext(os.path.basename(path))[0].replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not hasattr(module, "handle_query"):
+        raise ValueError(f"{path} has no handle_query function.")
+    return module.handle_query
+
+
+def _init_worker(path: str) -> None:
+    global _handle
+    _handle = load_handler(path)
+
+
+def _answer(line: str) -> tuple:
+    """Run the handler on one request, returning (answer line, seconds spent in the handler)."""
+    start = time.perf_counter()
+    try:
+        answer = str(_handle(line))
+    except Exception as error:
+        answer = f"error: {type(error).__name__}: {error}"
+    return answer.replace("\n", "\\n"), time.perf_counter() - start
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """
+    The nearest-rank p-th percentile of an ascending list.
+
+    Examples
+    --------
+    >>> percentile([1, 2, 3, 4], 50), percentile([1, 2, 3, 4], 99), percentile([5], 90)
+    (2, 4, 5)
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class LatencyStats:
+    """
+    The latencies of the answered requests: from reading the request to its answer being ready,
+    and the part of it spent in the handler.
+
+    Examples
+    --------
+    >>> stats = LatencyStats()
+    >>> for seconds in (0.001, 0.002, 0.010):
+    ...     stats.add(seconds, seconds)
+    >>> stats.report()
+    'requests=3 | total p50=2.00ms p90=10.00ms p99=10.00ms max=10.00ms | handler p50=2.00ms p90=10.00ms p99=10.00ms max=10.00ms'
+    """
+
+    def __init__(self):
+        self.total = []
+        self.handler = []
+
+    def add(self, total: float, handler: float) -> None:
+        self.total.append(total)
+        self.handler.append(handler)
+
+    def report(self) -> str:
+        parts = [f"requests={len(self.total)}"]
+        for name, values in (("total", sorted(self.total)), ("handler", sorted(self.handler))):
+            parts.append(" ".join([name] + [f"p{p}={percentile(values, p) * 1000:.2f}ms" for p in (50, 90, 99)]
+                                  + [f"max={(values[-1] if values else 0) * 1000:.2f}ms"]))
+        return " | ".join(parts)
+
+
+async def serve_stream(readline, write, executor, stats: LatencyStats, workers: int) -> None:
+    """
+    Answer the requests of one stream. readline is a coroutine function returning the next line as bytes
+    (empty at the end), and write one that sends a text answer. Requests are started as soon as they are read,
+    with at most `workers` waiting for their answer at a time, and the answers are written in the order of the requests.
+    """
+    loop = asyncio.get_running_loop()
+    pending = asyncio.Queue(maxsize=workers)
+
+    async def read_requests():
+        while True:
+            line = await readline()
+            if not line:
+                break
+            query = line.decode("utf-8").rstrip("\r\n")
+            if not query:
+                continue
+            started = time.perf_counter()
+            # ":stats" is answered when its turn to be written comes, so it covers all the requests before it
+            answer = None if query == ":stats" else loop.run_in_executor(executor, _answer, query)
+            await pending.put((answer, started))
+        await pending.put(None)
+
+    async def write_answers():
+        while (item := await pending.get()) is not None:
+            answer, started = item
+            if answer is None:
+                text = stats.report()
+            else:
+                text, handler_seconds = await answer
+                stats.add(time.perf_counter() - started, handler_seconds)
+            await write(text + "\n")
+
+    await asyncio.gather(read_requests(), write_answers())
+
+
+async def serve_stdin(executor, stats: LatencyStats, workers: int) -> None:
+    loop = asyncio.get_running_loop()
+
+    # A thread of the loop's own pool reads stdin, which may be a pipe, a terminal or a file
+    async def readline():
+        return await loop.run_in_executor(None, sys.stdin.buffer.readline)
+
+    async def write(text: str):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    await serve_stream(readline, write, executor, stats, workers)
+
+
+async def serve_socket(path: str, executor, stats: LatencyStats, workers: int) -> None:
+    async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def write(text: str):
+            writer.write(text.encode("utf-8"))
+            await writer.drain()
+
+        try:
+            await serve_stream(reader.readline, write, executor, stats, workers)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    # Serve until SIGINT or SIGTERM, then remove the socket file and let main() report the latencies
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    server = await asyncio.start_unix_server(client, path, limit=2 ** 24)
+    print(f"Serving on {path}", file=sys.stderr)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Answer many newline-delimited queries of one script.")
+    parser.add_argument("script", help="A script with a handle_query function, e.g. Assignment-7/7-b.py")
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of reading stdin")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Requests to run at once")
+    parser.add_argument("--processes", action="store_true",
+                        help="Run the requests in worker processes (for pure-Python, CPU-bound scripts) instead of threads")
+    args = parser.parse_args(argv)
+
+    script = os.path.abspath(args.script)
+    _init_worker(script)  # load (and warm up) once here, so that errors in the script show before serving
+    if args.processes:
+        executor = ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(script,))
+    else:
+        executor = ThreadPoolExecutor(args.workers)
+
+    stats = LatencyStats()
+    try:
+        with executor:
+            if args.socket:
+                asyncio.run(serve_socket(args.socket, executor, stats, args.workers))
+            else:
+                asyncio.run(serve_stdin(executor, stats, args.workers))
+    except KeyboardInterrupt:
+        pass
+    print(stats.report(), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()